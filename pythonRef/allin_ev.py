@@ -0,0 +1,286 @@
+# all-in adjusted EV over hand-history archives.
+#
+# hand histories (PokerStars text format) are streamed hand by hand and read
+# in fixed-size chunks. every all-in that reached showdown becomes a spot:
+# the shown hole cards, the board when the money went in, and the pot. spots
+# are canonicalized (suit isomorphism, player order) so identical spots are
+# solved once, their exact multi-way equity is computed in a worker pool, and
+# one JSON line per hand is appended to the output as each chunk finishes.
+# memory stays flat: one chunk plus a bounded cache of solved spots.
+#
+#   python allin_ev.py results.jsonl histories/*.txt --workers 8
+import argparse
+import itertools
+import json
+import os
+import re
+from collections import OrderedDict
+from multiprocessing import Pool
+from time import time
+from equity import Game, all_cards
+from hand import Card, RANK_VALUE
+
+CHUNK_HANDS = 1000
+
+# canonical spots kept across chunks
+CACHE_SIZE = 100_000
+
+# a real hand is well under this; anything longer is a header we failed to
+# recognise, and is dropped rather than held in memory
+MAX_HAND_LINES = 500
+
+SUITS = ["H", "C", "S", "D"]
+
+# "PokerStars Hand #", "PokerStars Zoom Hand #", "PokerStars Home Game Hand #", ...
+HAND_START = re.compile(r"^PokerStars (?:.*? )?(?:Hand|Game) #(\d+)")
+STREET = re.compile(r"^\*\*\* (FLOP|TURN|RIVER) \*\*\* (.*)$")
+ACTION = re.compile(r"^(.+?): (bets|calls|raises|checks|folds)\b")
+SHOWS = re.compile(r"^(.+?): shows \[(.+?)\]")
+COLLECTED = re.compile(r"^(.+?) collected \$?([\d,.]+) from")
+TOTAL_POT = re.compile(r"^Total pot \$?([\d,.]+).*?\| Rake \$?([\d,.]+)")
+
+
+# ------ PARSING -------
+
+def parse_amount(text):
+    return float(text.replace(",", ""))
+
+
+def parse_hh_cards(text):
+    # "Ah Kd" -> ["AH", "KD"]
+    return [c[0].upper() + c[1].upper() for c in text.split()]
+
+
+def iter_hands(paths):
+    """
+    Yield the lines of one hand at a time, reading files lazily. A hand
+    running past MAX_HAND_LINES is dropped up to the next header.
+    """
+    for path in paths:
+        lines = []
+        overflow = False
+        with open(path, encoding="utf-8-sig") as f:
+            for line in f:
+                line = line.rstrip("\n")
+                if HAND_START.match(line):
+                    if lines:
+                        yield lines
+                    lines = []
+                    overflow = False
+                if overflow:
+                    continue
+                if line.strip() or lines:
+                    lines.append(line)
+                if len(lines) > MAX_HAND_LINES:
+                    lines = []
+                    overflow = True
+        if lines:
+            yield lines
+
+
+def parse_spot(lines):
+    """
+    The all-in spot of one hand, or None when the hand is not a
+    showdown all-in with a single pot.
+    """
+    hand_id = None
+    board = []
+    allin = False
+    board_at_allin = []
+    shown = {}
+    won = {}
+    pot = None
+
+    for line in lines:
+        m = HAND_START.match(line)
+        if m:
+            hand_id = m.group(1)
+            continue
+
+        m = STREET.match(line)
+        if m:
+            # "[2c 7d Jh] [Qs]": the last bracket holds the new cards
+            board = parse_hh_cards(" ".join(re.findall(r"\[(.*?)\]", m.group(2))))
+            continue
+
+        m = ACTION.match(line)
+        if m:
+            # the last all-in is called on its own street; with a single
+            # pot the streets after it are only checked down
+            if "all-in" in line:
+                allin = True
+                board_at_allin = list(board)
+            continue
+
+        m = SHOWS.match(line)
+        if m:
+            shown[m.group(1)] = parse_hh_cards(m.group(2))
+            continue
+
+        m = COLLECTED.match(line)
+        if m:
+            won[m.group(1)] = won.get(m.group(1), 0.0) + parse_amount(m.group(2))
+            continue
+
+        m = TOTAL_POT.match(line)
+        if m:
+            # side pots need per-pot eligibility, which we do not track
+            if "Side pot" in line:
+                return None
+            pot = parse_amount(m.group(1)) - parse_amount(m.group(2))
+
+    if not allin or len(shown) < 2 or pot is None:
+        return None
+
+    names = list(shown)
+    return {
+        "hand": hand_id,
+        "board": board_at_allin,
+        "pot": pot,
+        "names": names,
+        "cards": [shown[n] for n in names],
+        "won": [won.get(n, 0.0) for n in names],
+    }
+
+
+# ------ CANONICAL SPOTS -------
+
+def card_key(card_str):
+    return (RANK_VALUE[card_str[0]], card_str[1])
+
+
+def canonicalize(hands, board):
+    """
+    Smallest relabelling of the spot over all suit permutations, with the
+    players sorted. Returns (key, order) where order[i] is the position of
+    player i in the key.
+    """
+    best = None
+
+    for perm in itertools.permutations(SUITS):
+        relabel = dict(zip(SUITS, perm))
+        mapped = [
+            tuple(sorted((c[0] + relabel[c[1]] for c in cards), key=card_key))
+            for cards in hands
+        ]
+        key = (
+            tuple(sorted(mapped, key=lambda h: [card_key(c) for c in h])),
+            tuple(sorted((c[0] + relabel[c[1]] for c in board), key=card_key)),
+        )
+        if best is None or key < best[0]:
+            best = (key, mapped)
+
+    key, mapped = best
+    order = [key[0].index(h) for h in mapped]
+    return key, order
+
+
+def spot_equities(key):
+    hands, board = key
+    game = Game(all_cards)
+    result = game.exact_equity_multiway(
+        [[Card(c[0], c[1]) for c in cards] for cards in hands],
+        [Card(c[0], c[1]) for c in board]
+    )
+    return key, result["equities"]
+
+
+# ------ PIPELINE -------
+
+def run_pipeline(paths, out_path, workers=None, chunk_hands=CHUNK_HANDS,
+                 cache_size=CACHE_SIZE):
+    """
+    Stream every hand in paths, write one JSON line per all-in spot to
+    out_path, and return throughput stats.
+    """
+    cache = OrderedDict()
+    hands_read = 0
+    spots = 0
+    solved = 0
+    start = time()
+
+    hands = iter_hands(paths)
+    num_workers = workers or os.cpu_count()
+
+    with Pool(num_workers) as pool, open(out_path, "w") as out:
+        while True:
+            chunk = list(itertools.islice(hands, chunk_hands))
+            if not chunk:
+                break
+            hands_read += len(chunk)
+
+            parsed = []
+            for lines in chunk:
+                spot = parse_spot(lines)
+                if spot is None:
+                    continue
+                key, order = canonicalize(spot["cards"], spot["board"])
+                parsed.append((spot, key, order))
+
+            # each distinct spot missing from the cache is solved once
+            missing = list(dict.fromkeys(
+                key for _, key, _ in parsed if key not in cache
+            ))
+            for key, equities in pool.imap_unordered(spot_equities, missing):
+                cache[key] = equities
+            solved += len(missing)
+
+            for spot, key, order in parsed:
+                equities = cache[key]
+                cache.move_to_end(key)
+
+                players = []
+                for i, name in enumerate(spot["names"]):
+                    equity = equities[order[i]]
+                    ev = equity * spot["pot"]
+                    players.append({
+                        "name": name,
+                        "cards": "".join(spot["cards"][i]),
+                        "equity": round(equity, 6),
+                        "ev": round(ev, 2),
+                        "won": spot["won"][i],
+                        "adjustment": round(ev - spot["won"][i], 2),
+                    })
+
+                out.write(json.dumps({
+                    "hand": spot["hand"],
+                    "board": "".join(spot["board"]),
+                    "pot": spot["pot"],
+                    "players": players,
+                }) + "\n")
+            spots += len(parsed)
+            out.flush()
+
+            while len(cache) > cache_size:
+                cache.popitem(last=False)
+
+    seconds = time() - start
+
+    return {
+        "hands": hands_read,
+        "spots": spots,
+        "solved": solved,
+        "seconds": seconds,
+        "workers": num_workers,
+        "hands_per_sec_per_core": hands_read / seconds / num_workers if seconds else 0.0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="All-in adjusted EV from hand histories")
+    parser.add_argument("out")
+    parser.add_argument("paths", nargs="+")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk", type=int, default=CHUNK_HANDS)
+    args = parser.parse_args(argv)
+
+    stats = run_pipeline(args.paths, args.out, args.workers, args.chunk)
+
+    print(f"Hands:   {stats['hands']}")
+    print(f"Spots:   {stats['spots']} ({stats['solved']} solved, rest deduplicated)")
+    print(f"Time:    {stats['seconds']:.2f} seconds on {stats['workers']} workers")
+    print(f"Rate:    {stats['hands_per_sec_per_core']:.1f} hands/sec per core")
+
+
+if __name__ == "__main__":
+    main()
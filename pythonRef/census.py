@@ -0,0 +1,218 @@
+# exhaustive 7-card census: evaluates every 7-card hand with each engine,
+# checks the category frequencies against the known totals, reports any hand
+# where an engine disagrees with Hand.get_hand_from_scratch, and times every engine.
+#
+#   python census.py --workers 8 --engines hand state
+#
+# the full deck is C(52, 7) = 133,784,560 hands; --deck-size runs the same
+# census over the first N cards of the deck for a quick check.
+import argparse
+import itertools
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from time import perf_counter, time
+from equity import all_cards
+from hand import Hand, HandState, hand_rankings
+
+# number of 7-card hands of each category over a full 52-card deck
+CENSUS_TOTALS = {
+    "Straight Flush": 41584,
+    "Quads": 224848,
+    "Full House": 3473184,
+    "Flush": 4047644,
+    "Straight": 6180020,
+    "Trips": 6461620,
+    "Two Pair": 31433400,
+    "Pair": 58627800,
+    "High Card": 23294460,
+}
+
+# the first engine is the oracle every other engine is checked against
+ENGINES = {
+    "hand": lambda cards: Hand(cards).get_hand_from_scratch(),
+    "state": lambda cards: HandState(cards).get_hand(),
+}
+
+ORACLE = "hand"
+
+# disagreements kept per work unit, the rest are only counted
+MAX_REPORTED = 5
+
+
+# ------ HELPERS -------
+
+def agrees(expected, result):
+    return (
+        result is not None and
+        result.type == expected.type and
+        result.ranks == expected.ranks
+    )
+
+
+def minimal_repro(cards, engine, hand_size=5):
+    """
+    Drop cards one at a time for as long as the engine still disagrees
+    with the oracle, down to hand_size cards.
+    """
+    oracle = ENGINES[ORACLE]
+    evaluate = ENGINES[engine]
+    cards = list(cards)
+
+    shrunk = True
+    while shrunk and len(cards) > hand_size:
+        shrunk = False
+        for i in range(len(cards)):
+            fewer = cards[:i] + cards[i + 1:]
+            if not agrees(oracle(fewer), evaluate(fewer)):
+                cards = fewer
+                shrunk = True
+                break
+
+    return cards
+
+
+def work_units(deck_size, hand_size):
+    # one unit per choice of the first three cards keeps units small enough
+    # for an even spread over the pool
+    prefix = min(3, hand_size)
+    return list(itertools.combinations(range(deck_size), prefix))
+
+
+# ------ WORKER -------
+
+def census_unit(prefix, deck_size, hand_size, engines):
+    deck = all_cards[:deck_size]
+    start = prefix[-1] + 1 if prefix else 0
+    rest_size = hand_size - len(prefix)
+
+    categories = Counter()
+    seconds = dict.fromkeys(engines, 0.0)
+    mismatches = Counter()
+    reported = []
+    hands = 0
+
+    head = [deck[i] for i in prefix]
+
+    for rest in itertools.combinations(range(start, deck_size), rest_size):
+        cards = head + [deck[i] for i in rest]
+        hands += 1
+
+        results = {}
+        for name in engines:
+            evaluate = ENGINES[name]
+            t = perf_counter()
+            results[name] = evaluate(cards)
+            seconds[name] += perf_counter() - t
+
+        expected = results[ORACLE]
+        categories[expected.type] += 1
+
+        for name in engines:
+            if name == ORACLE or agrees(expected, results[name]):
+                continue
+            mismatches[name] += 1
+            if len(reported) < MAX_REPORTED:
+                reported.append((name, [f"{c.rank}{c.suit}" for c in cards]))
+
+    return {
+        "hands": hands,
+        "categories": categories,
+        "seconds": seconds,
+        "mismatches": mismatches,
+        "reported": reported,
+    }
+
+
+# ------ CENSUS -------
+
+def run_census(engines=("hand", "state"), deck_size=52, hand_size=7, workers=None):
+    if ORACLE not in engines:
+        engines = (ORACLE,) + tuple(engines)
+    for name in engines:
+        if name not in ENGINES:
+            raise ValueError(f"unknown engine {name!r}, expected one of {list(ENGINES)}")
+
+    units = work_units(deck_size, hand_size)
+
+    categories = Counter()
+    seconds = dict.fromkeys(engines, 0.0)
+    mismatches = Counter()
+    reported = []
+    hands = 0
+
+    start = time()
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = pool.map(
+            census_unit,
+            units,
+            itertools.repeat(deck_size),
+            itertools.repeat(hand_size),
+            itertools.repeat(tuple(engines)),
+            chunksize=max(1, len(units) // 1000),
+        )
+        for unit in results:
+            hands += unit["hands"]
+            categories.update(unit["categories"])
+            mismatches.update(unit["mismatches"])
+            for name, s in unit["seconds"].items():
+                seconds[name] += s
+            reported.extend(unit["reported"][:MAX_REPORTED - len(reported)])
+
+    cards_by_str = {f"{c.rank}{c.suit}": c for c in all_cards}
+    repros = [
+        (name, [f"{c.rank}{c.suit}" for c in
+                minimal_repro([cards_by_str[s] for s in hand], name)])
+        for name, hand in reported
+    ]
+
+    return {
+        "hands": hands,
+        "categories": dict(categories),
+        "expected": CENSUS_TOTALS if (deck_size, hand_size) == (52, 7) else None,
+        "mismatches": dict(mismatches),
+        "repros": repros,
+        # per-engine throughput in hands per CPU second
+        "hands_per_sec": {
+            name: hands / s if s else float("inf")
+            for name, s in seconds.items()
+        },
+        "seconds": time() - start,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Exhaustive 7-card hand census")
+    parser.add_argument("--engines", nargs="+", default=list(ENGINES))
+    parser.add_argument("--deck-size", type=int, default=52)
+    parser.add_argument("--hand-size", type=int, default=7)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    result = run_census(args.engines, args.deck_size, args.hand_size, args.workers)
+    ok = True
+
+    print(f"Hands:   {result['hands']}")
+    for category in hand_rankings:
+        count = result["categories"].get(category, 0)
+        line = f"{category:<15} {count:>10}"
+        if result["expected"]:
+            expected = result["expected"][category]
+            line += "  ok" if count == expected else f"  EXPECTED {expected}"
+            ok = ok and count == expected
+        print(line)
+
+    for name, rate in result["hands_per_sec"].items():
+        wrong = result["mismatches"].get(name, 0)
+        print(f"{name:<8} {rate:>12,.0f} hands/sec per core  {wrong} disagreements")
+        ok = ok and not wrong
+
+    for name, cards in result["repros"]:
+        print(f"{name} disagrees with {ORACLE} on {' '.join(cards)}")
+
+    print(f"Time:    {result['seconds']:.2f} seconds")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,6 +1,99 @@
 import itertools
+import math
+from functools import lru_cache
 from time import time
-from hand import Card, Hand, HandResult
+from hand import Card, HandResult, HandState, HAND_STRENGTH
+from ranges import card_id, cards_mask, compile_range
+
+def count_seatings(live_cards, num_opponents):
+    """
+    Ways to seat num_opponents unordered, disjoint hole-card pairs
+    from live_cards cards.
+    """
+    if 2 * num_opponents > live_cards:
+        return 0
+    return math.factorial(live_cards) // (
+        math.factorial(live_cards - 2 * num_opponents)
+        * math.factorial(num_opponents)
+        * 2 ** num_opponents
+    )
+
+
+def matching_counter(counts, allowed):
+    """
+    Counter for seatings of disjoint pairs when the live cards fall in
+    interchangeable classes: counts[i] cards of class i, and a pair of a
+    class i and a class j card is allowed when j in allowed[i].
+
+    Works card by card: the first remaining card either sits out, or is
+    paired with any allowed card left. Cards of a class are identical, so
+    pairing with class j counts once per card left in j.
+    """
+    # classes that cannot be part of any allowed pair only ever sit out
+    keep = [
+        i for i, js in enumerate(allowed)
+        if any(j != i or counts[i] >= 2 for j in js)
+    ]
+    index = {i: n for n, i in enumerate(keep)}
+    start = tuple(counts[i] for i in keep)
+    edges = [[index[j] for j in allowed[i] if j in index] for i in keep]
+
+    @lru_cache(maxsize=None)
+    def seat(counts, k):
+        if k == 0:
+            return 1
+        if sum(counts) < 2 * k:
+            return 0
+
+        i = next(i for i, c in enumerate(counts) if c)
+        rest = list(counts)
+        rest[i] -= 1
+
+        ways = seat(tuple(rest), k)
+        for j in edges[i]:
+            if rest[j]:
+                paired = list(rest)
+                paired[j] -= 1
+                ways += rest[j] * seat(tuple(paired), k - 1)
+        return ways
+
+    return lambda k: seat(start, k)
+
+
+def count_pairs(counts, allowed):
+    return sum(
+        counts[i] * (counts[i] - 1) // 2 if i == j else counts[i] * counts[j]
+        for i, js in enumerate(allowed) for j in js if j >= i
+    )
+
+
+def count_allowed_seatings(counts, allowed, num_opponents):
+    """
+    Seatings of num_opponents disjoint pairs using only allowed pairs.
+
+    When most pairs are allowed, counting goes through the blocked pairs
+    instead, by inclusion-exclusion over the blocked pairs a seating of
+    the whole deck uses: sum over j of (-1)^j * (ways to pick j disjoint
+    blocked pairs) * (ways to seat the rest from what is left).
+    """
+    classes = range(len(counts))
+    blocked = [
+        [j for j in classes if j not in set(allowed[i])]
+        for i in classes
+    ]
+
+    if count_pairs(counts, allowed) <= count_pairs(counts, blocked):
+        return matching_counter(counts, allowed)(num_opponents)
+
+    live_cards = sum(counts)
+    blocked_matchings = matching_counter(counts, blocked)
+    return sum(
+        (-1) ** j
+        * blocked_matchings(j)
+        * count_seatings(live_cards - 2 * j, num_opponents - j)
+        for j in range(num_opponents + 1)
+    )
+
 
 class Game:
     def __init__(self, all_cards):
@@ -13,46 +106,270 @@ class Game:
             if (c.rank, c.suit) not in used
         ]
 
-    def exact_equity_vs_one(self, hero_cards, board_cards=None):
+    # deterministic: every caller building the same deck gets the same order
+    def opponent_combos(self, hero_cards, board_cards=None):
         if board_cards is None:
             board_cards = []
+        deck = self.remaining_deck(hero_cards + board_cards)
+        return list(itertools.combinations(deck, 2))
 
+    # live combos of an opponent range as Card pairs, with their weights
+    def range_combos(self, opp_range, hero_cards, board_cards=None):
+        if board_cards is None:
+            board_cards = []
         used_cards = hero_cards + board_cards
-        deck = self.remaining_deck(used_cards)
+        live = compile_range(opp_range).live(cards_mask(used_cards))
+        if not len(live):
+            raise ValueError(f"range {live.text!r} has no live combos on this board")
+
+        by_id = {card_id(c): c for c in self.remaining_deck(used_cards)}
+        combos = [(by_id[a], by_id[b]) for a, b in live.card_pairs()]
+        return combos, list(live.weights)
+
+    # every num_shards-th opponent combo, starting at shard
+    def shard_combos(self, hero_cards, board_cards, shard, num_shards):
+        combos = self.opponent_combos(hero_cards, board_cards)
+        return combos[shard::num_shards]
+
+    def count_vs_combos(self, hero_cards, board_cards, opp_combos, weights=None):
+        """
+        Win / loss / tie counts against the given opponent hole cards,
+        over every completion of the board. With weights, every runout
+        against a combo counts as that combo's weight.
+        """
+        deck = self.remaining_deck(hero_cards + board_cards)
+        needed = 5 - len(board_cards)
 
         wins = 0
         losses = 0
         ties = 0
 
+        for k, opp_cards in enumerate(opp_combos):
+            weight = 1 if weights is None else weights[k]
+            deck_after_opp = [
+                c for c in deck if c not in opp_cards
+            ]
+
+            hero_state = HandState(hero_cards + board_cards)
+            opp_state = HandState(list(opp_cards) + board_cards)
+
+            # Complete the board to 5 cards, one card deeper at a time
+            def deal(start, depth):
+                nonlocal wins, losses, ties
+
+                if depth == needed:
+                    hero_key = hero_state.cmp_key()
+                    opp_key = opp_state.cmp_key()
+
+                    if hero_key > opp_key:
+                        wins += weight
+                    elif hero_key < opp_key:
+                        losses += weight
+                    else:
+                        ties += weight
+                    return
+
+                for i in range(start, len(deck_after_opp) - (needed - depth) + 1):
+                    c = deck_after_opp[i]
+                    hero_state.add_card(c)
+                    opp_state.add_card(c)
+                    deal(i + 1, depth + 1)
+                    hero_state.remove_card(c)
+                    opp_state.remove_card(c)
+
+            deal(0, 0)
+
+        return {
+            "wins": wins,
+            "losses": losses,
+            "ties": ties,
+            "total": wins + losses + ties,
+        }
+
+    def exact_equity_shard(self, hero_cards, board_cards, shard, num_shards):
+        combos = self.shard_combos(hero_cards, board_cards, shard, num_shards)
+        return self.count_vs_combos(hero_cards, board_cards, combos)
+
+    def exact_equity_vs_one(self, hero_cards, board_cards=None, opp_range=None):
+        """
+        Exact equity against one opponent holding any two cards, or a hand
+        from opp_range (a range string or ranges.CompiledRange) when given.
+        """
+        if board_cards is None:
+            board_cards = []
+
         start = time()
 
         # Opponent hole cards
-        for opp_cards in itertools.combinations(deck, 2):
-            deck_after_opp = [
-                c for c in deck if c not in opp_cards
+        if opp_range is None:
+            combos = self.opponent_combos(hero_cards, board_cards)
+            weights = None
+        else:
+            combos, weights = self.range_combos(opp_range, hero_cards, board_cards)
+
+        counts = self.count_vs_combos(hero_cards, board_cards, combos, weights)
+
+        elapsed = time() - start
+
+        return {
+            "equity": counts["wins"] / counts["total"],
+            "wins": counts["wins"],
+            "losses": counts["losses"],
+            "ties": counts["ties"],
+            "total": counts["total"],
+            "seconds": elapsed
+        }
+
+    def exact_equity_multiway(self, player_cards, board_cards=None):
+        """
+        Exact equity of every player when all hole cards are known,
+        over every completion of the board. Split pots count as a share.
+        """
+        if board_cards is None:
+            board_cards = []
+
+        used_cards = [c for cards in player_cards for c in cards] + board_cards
+        deck = self.remaining_deck(used_cards)
+        needed = 5 - len(board_cards)
+
+        states = [HandState(list(cards) + board_cards) for cards in player_cards]
+        shares = [0.0] * len(player_cards)
+        total = 0
+
+        start = time()
+
+        def showdown():
+            best = min(HAND_STRENGTH[s.category] for s in states)
+            contenders = [
+                i for i, s in enumerate(states)
+                if HAND_STRENGTH[s.category] == best
             ]
 
-            # Complete the board to 5 cards
-            for board_rest in itertools.combinations(
-                deck_after_opp, 5 - len(board_cards)
-            ):
-                full_board = board_cards + list(board_rest)
+            # only players in the best category need their ranks built
+            if len(contenders) > 1:
+                ranks = {i: states[i].get_ranks() for i in contenders}
+                top = max(ranks.values())
+                contenders = [i for i in contenders if ranks[i] == top]
+
+            for i in contenders:
+                shares[i] += 1 / len(contenders)
+
+        # Complete the board to 5 cards, one card deeper at a time
+        def deal(first, depth):
+            nonlocal total
+
+            if depth == needed:
+                showdown()
+                total += 1
+                return
+
+            for i in range(first, len(deck) - (needed - depth) + 1):
+                c = deck[i]
+                for s in states:
+                    s.add_card(c)
+                deal(i + 1, depth + 1)
+                for s in states:
+                    s.remove_card(c)
 
-                hero_hand = Hand(hero_cards + full_board).get_hand()
-                opp_hand = Hand(list(opp_cards) + full_board).get_hand()
+        deal(0, 0)
 
-                if hero_hand > opp_hand:
-                    wins += 1
-                elif hero_hand < opp_hand:
-                    losses += 1
-                else:
-                    ties += 1
+        return {
+            "equities": [share / total for share in shares],
+            "total": total,
+            "seconds": time() - start
+        }
+
+    def exact_equity_vs_many(self, hero_cards, board_cards, num_opponents):
+        """
+        Exact win / tie / loss against num_opponents random hands from the
+        flop on, without enumerating the seatings.
+
+        For every runout the live cards are grouped into classes that play
+        identically (same rank, and same suit only for the one suit that can
+        still make a flush). Every class pair is ranked against hero once,
+        then count_allowed_seatings counts the seatings where every opponent loses
+        to hero, or loses or ties.
+        """
+        if len(board_cards) < 3:
+            raise ValueError("exact multi-way equity needs at least a flop")
+
+        deck = self.remaining_deck(hero_cards + board_cards)
+        needed = 5 - len(board_cards)
+        live_cards = len(deck) - needed
+        seatings = count_seatings(live_cards, num_opponents)
+        if not seatings:
+            raise ValueError(f"not enough cards left for {num_opponents} opponents")
+
+        wins = 0
+        ties = 0
+        runouts = 0
+
+        start = time()
 
-        total = wins + losses + ties
+        for board_rest in itertools.combinations(deck, needed):
+            board = board_cards + list(board_rest)
+            live = [c for c in deck if c not in board_rest]
+
+            suit_counts = {}
+            for c in board:
+                suit_counts[c.suit] = suit_counts.get(c.suit, 0) + 1
+            flush_suit = next((s for s, n in suit_counts.items() if n >= 3), None)
+
+            # ---- Group interchangeable live cards ----
+            classes = {}
+            for c in live:
+                key = (c.rank, c.suit == flush_suit)
+                classes.setdefault(key, []).append(c)
+            members = list(classes.values())
+            counts = [len(m) for m in members]
+
+            # ---- Rank every class pair against hero once ----
+            board_state = HandState(board)
+            for c in hero_cards:
+                board_state.add_card(c)
+            hero_key = board_state.cmp_key()
+            for c in hero_cards:
+                board_state.remove_card(c)
+
+            beats = [[] for _ in members]
+            beats_or_ties = [[] for _ in members]
+
+            for i, j in itertools.combinations_with_replacement(range(len(members)), 2):
+                if i == j and counts[i] < 2:
+                    continue
+                pair = members[i][:2] if i == j else [members[i][0], members[j][0]]
+
+                for c in pair:
+                    board_state.add_card(c)
+                opp_key = board_state.cmp_key()
+                for c in pair:
+                    board_state.remove_card(c)
+
+                if hero_key > opp_key:
+                    beats[i].append(j)
+                    beats_or_ties[i].append(j)
+                    if i != j:
+                        beats[j].append(i)
+                        beats_or_ties[j].append(i)
+                elif hero_key == opp_key:
+                    beats_or_ties[i].append(j)
+                    if i != j:
+                        beats_or_ties[j].append(i)
+
+            won = count_allowed_seatings(counts, beats, num_opponents)
+            wins += won
+            ties += count_allowed_seatings(counts, beats_or_ties, num_opponents) - won
+            runouts += 1
+
+        total = runouts * seatings
+        losses = total - wins - ties
         elapsed = time() - start
 
         return {
             "equity": wins / total,
+            "win": wins / total,
+            "tie": ties / total,
+            "loss": losses / total,
             "wins": wins,
             "losses": losses,
             "ties": ties,
@@ -66,19 +383,21 @@ card_suits = ["H", "C", "S", "D"]
 all_cards = [Card(r, s) for r in card_ranks for s in card_suits]
 
 
-game = Game(all_cards)
+if __name__ == "__main__":
+
+    game = Game(all_cards)
 
-hero = [
-    Card("A", "H"),
-    Card("A", "C")
-]
+    hero = [
+        Card("A", "H"),
+        Card("A", "C")
+    ]
 
-result = game.exact_equity_vs_one(hero)
+    result = game.exact_equity_vs_one(hero)
 
-print("AA vs 1 opponent (exact):")
-print(f"Equity:  {result['equity']:.4f}")
-print(f"Wins:    {result['wins']}")
-print(f"Losses:  {result['losses']}")
-print(f"Ties:    {result['ties']}")
-print(f"Total:   {result['total']}")
-print(f"Time:    {result['seconds']:.2f} seconds")
+    print("AA vs 1 opponent (exact):")
+    print(f"Equity:  {result['equity']:.4f}")
+    print(f"Wins:    {result['wins']}")
+    print(f"Losses:  {result['losses']}")
+    print(f"Ties:    {result['ties']}")
+    print(f"Total:   {result['total']}")
+    print(f"Time:    {result['seconds']:.2f} seconds")
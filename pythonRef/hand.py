@@ -5,6 +5,9 @@ from collections import defaultdict
 hand_rankings = ["Straight Flush", "Quads", "Full House", 
             "Flush", "Straight", "Trips", "Two Pair", "Pair", "High Card"]
 
+# lower is better, same as HandResult.strength
+HAND_STRENGTH = {hand_type: i for i, hand_type in enumerate(hand_rankings)}
+
 RANK_VALUE = {
     "2": 2, "3": 3, "4": 4, "5": 5, "6": 6, "7": 7,
     "8": 8, "9": 9, "T": 10, "J": 11, "Q": 12, "K": 13, "A": 14
@@ -65,16 +68,223 @@ class HandResult:
         )
 
 
+# bitmasks over card values (bit v set for value v), highest straight first.
+# the wheel uses bit 1 as the low ace.
+STRAIGHT_MASKS = [(high, 0b11111 << (high - 4)) for high in range(14, 4, -1)]
+
+
+# incremental counterpart of Hand.get_hand_from_scratch, and what
+# Hand.get_hand answers from: keeps the counts and masks the evaluator needs
+# up to date as cards are added and removed, so dealing a street (or
+# backtracking during an enumeration) is O(1) per card.
+class HandState:
+
+    def __init__(self, cards=None):
+        self.cards = []
+        self.rank_counts = [0] * 15         # indexed by card value
+        self.suit_counts = defaultdict(int)
+        self.suit_masks = defaultdict(int)  # suit -> bitmask of values
+        self.rank_mask = 0                  # values with at least one card
+        self.num_pairs = 0                  # values with 2+ cards
+        self.num_trips = 0                  # values with 3+ cards
+        self.num_quads = 0                  # values with 4 cards
+        self.category = None
+
+        for c in cards or []:
+            self.add_card(c)
+
+    def add_card(self, card):
+        v = card.value
+        self.cards.append(card)
+
+        count = self.rank_counts[v] + 1
+        self.rank_counts[v] = count
+        if count == 1:
+            self.rank_mask |= 1 << v
+        elif count == 2:
+            self.num_pairs += 1
+        elif count == 3:
+            self.num_trips += 1
+        elif count == 4:
+            self.num_quads += 1
+
+        self.suit_counts[card.suit] += 1
+        self.suit_masks[card.suit] |= 1 << v
+
+        self.category = self._category()
+
+    def remove_card(self, card):
+        v = card.value
+        self.cards.remove(card)
+
+        count = self.rank_counts[v]
+        self.rank_counts[v] = count - 1
+        if count == 1:
+            self.rank_mask &= ~(1 << v)
+        elif count == 2:
+            self.num_pairs -= 1
+        elif count == 3:
+            self.num_trips -= 1
+        elif count == 4:
+            self.num_quads -= 1
+
+        self.suit_counts[card.suit] -= 1
+        self.suit_masks[card.suit] &= ~(1 << v)
+
+        self.category = self._category() if self.cards else None
+
+    # ------ HELPERS -------
+
+    def get_flush_suit(self):
+        for suit, count in self.suit_counts.items():
+            if count >= 5:
+                return suit
+        return None
+
+    @staticmethod
+    def straight_high(mask):
+        if mask & (1 << 14):
+            mask |= 1 << 1
+        for high, straight in STRAIGHT_MASKS:
+            if mask & straight == straight:
+                return high
+        return None
+
+    @staticmethod
+    def straight_ranks(high):
+        if high == 5:
+            return [5, 4, 3, 2, 14]
+        return list(range(high, high - 5, -1))
+
+    def values_desc(self, mask=None, exclude=(), min_count=1):
+        if mask is None:
+            mask = self.rank_mask
+        return [
+            v for v in range(14, 1, -1)
+            if mask & (1 << v)
+            and v not in exclude
+            and self.rank_counts[v] >= min_count
+        ]
+
+    def _category(self):
+        flush_suit = self.get_flush_suit()
+
+        if flush_suit and self.straight_high(self.suit_masks[flush_suit]):
+            return "Straight Flush"
+        if self.num_quads:
+            return "Quads"
+        if self.num_trips and self.num_pairs >= 2:
+            return "Full House"
+        if flush_suit:
+            return "Flush"
+        if self.straight_high(self.rank_mask):
+            return "Straight"
+        if self.num_trips:
+            return "Trips"
+        if self.num_pairs >= 2:
+            return "Two Pair"
+        if self.num_pairs:
+            return "Pair"
+        return "High Card"
+
+    # ------ Get Hand Values --------
+
+    # the card values get_hand would report for the current category
+    def get_ranks(self):
+        category = self.category
+
+        if category == "Straight Flush":
+            suit_mask = self.suit_masks[self.get_flush_suit()]
+            return self.straight_ranks(self.straight_high(suit_mask))
+
+        if category == "Quads":
+            quad = self.values_desc(min_count=4)[0]
+            return [quad] * 4 + self.values_desc(exclude=(quad,))[:1]
+
+        if category == "Full House":
+            trip = self.values_desc(min_count=3)[0]
+            pair = self.values_desc(exclude=(trip,), min_count=2)[0]
+            return [trip] * 3 + [pair] * 2
+
+        if category == "Flush":
+            suit_mask = self.suit_masks[self.get_flush_suit()]
+            return self.values_desc(mask=suit_mask)[:5]
+
+        if category == "Straight":
+            return self.straight_ranks(self.straight_high(self.rank_mask))
+
+        if category == "Trips":
+            trip = self.values_desc(min_count=3)[0]
+            return [trip] * 3 + self.values_desc(exclude=(trip,))[:2]
+
+        if category == "Two Pair":
+            high, low = self.values_desc(min_count=2)[:2]
+            kicker = self.values_desc(exclude=(high, low))[:1]
+            return [high] * 2 + [low] * 2 + kicker
+
+        if category == "Pair":
+            pair = self.values_desc(min_count=2)[0]
+            return [pair] * 2 + self.values_desc(exclude=(pair,))[:3]
+
+        return self.values_desc()[:5]
+
+    # same ordering as HandResult._cmp_key, without building the result
+    def cmp_key(self):
+        return (-HAND_STRENGTH[self.category], self.get_ranks())
+
+    def get_hand(self):
+        if not self.cards:
+            return None
+
+        ranks = self.get_ranks()
+
+        # flushes have to be rebuilt from the flush suit only
+        pool = self.cards
+        if self.category in ("Straight Flush", "Flush"):
+            suit = self.get_flush_suit()
+            pool = [c for c in self.cards if c.suit == suit]
+
+        # pick a concrete card for every rank, never reusing one
+        remaining = list(pool)
+        cards = []
+        for v in ranks:
+            for c in remaining:
+                if c.value == v:
+                    cards.append(c)
+                    remaining.remove(c)
+                    break
+
+        return HandResult(self.category, cards)
+
+
 # each player will have a hand object to determine their standing
 class Hand:
 
     def __init__(self, cards=None):
         self.cards = cards
+        self._state = None
+
+    # built on first use, then kept up to date card by card, so dealing a
+    # hand street by street never re-evaluates it from scratch
+    @property
+    def state(self):
+        if self._state is None:
+            self._state = HandState(self.cards)
+        return self._state
 
     def add_card(self, card):
         if not self.cards:
             self.cards = []
         self.cards.append(card)
+        if self._state is not None:
+            self._state.add_card(card)
+
+    def remove_card(self, card):
+        if not self.cards:
+            return
+        self.cards.remove(card)
+        if self._state is not None:
+            self._state.remove_card(card)
 
     # ------ HELPERS -------
     
@@ -323,6 +533,10 @@ class Hand:
 
     # based on a hand, get the metadata of the best combo of the hand
     def get_hand(self):
+        return self.state.get_hand()
+
+    # the original evaluator, kept as the reference HandState is checked against
+    def get_hand_from_scratch(self):
         
         checks = [
             ("Straight Flush", self.get_straight_flush),
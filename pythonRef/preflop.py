@@ -0,0 +1,302 @@
+# preflop all-in equity charts: equity of every one of the 169 starting-hand
+# classes against 1-9 random opponents, sampled to a target precision in a
+# process pool and saved as a small versioned lookup file that
+# MonteCarloSimulator.estimate_equity consults when the board is empty.
+#
+#   python preflop.py preflop_chart.json --precision 0.002 --workers 8
+import argparse
+import json
+import math
+import os
+import random
+from array import array
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from time import time
+import shared_tables
+from equity import all_cards
+from hand import Card
+from simulation import MonteCarloSimulator
+
+CHART_VERSION = 2
+
+# high to low, as in the usual 13x13 grid
+CHART_RANKS = ["A", "K", "Q", "J", "T", "9", "8", "7", "6", "5", "4", "3", "2"]
+
+MAX_OPPONENTS = 9
+
+BATCH_TRIALS = 2000
+
+
+# ------ HAND CLASSES -------
+
+def hand_classes():
+    classes = []
+    for i, high in enumerate(CHART_RANKS):
+        for j, low in enumerate(CHART_RANKS):
+            if i == j:
+                classes.append(high + low)
+            elif i < j:
+                classes.append(high + low + "s")
+                classes.append(high + low + "o")
+    return classes
+
+
+HAND_CLASSES = hand_classes()
+
+
+def hand_class(cards):
+    """
+    Class name ("AA", "AKs", "AKo") of two hole cards.
+    """
+    a, b = sorted(cards, key=lambda c: c.value, reverse=True)
+    if a.rank == b.rank:
+        return a.rank + b.rank
+    return a.rank + b.rank + ("s" if a.suit == b.suit else "o")
+
+
+def class_cards(name):
+    """
+    Representative hole cards for a class; against random opponents the
+    suits themselves do not matter.
+    """
+    if len(name) == 2 or name.endswith("o"):
+        return [Card(name[0], "H"), Card(name[1], "C")]
+    return [Card(name[0], "H"), Card(name[1], "H")]
+
+
+# ------ SAMPLING -------
+
+def standard_error(wins, ties, trials):
+    # per-trial equity is 1 for a win, 1/2 for a tie, 0 for a loss
+    mean = (wins + ties / 2) / trials
+    var = (wins + ties / 4) / trials - mean * mean
+    return math.sqrt(max(var, 0.0) / trials)
+
+
+def chart_entry(name, num_opponents, precision, max_trials, seed):
+    """
+    Sample one class against num_opponents random hands in batches until
+    the standard error of its equity drops below precision.
+    """
+    random.seed(f"{seed}-{name}-{num_opponents}")
+    sim = MonteCarloSimulator(all_cards)
+    hero = class_cards(name)
+
+    wins = 0
+    ties = 0
+    trials = 0
+
+    while trials < max_trials:
+        batch = min(BATCH_TRIALS, max_trials - trials)
+        result = sim.estimate_equity(hero, [], num_opponents, batch)
+        wins += round(result["win"] * batch)
+        ties += round(result["tie"] * batch)
+        trials += batch
+
+        if standard_error(wins, ties, trials) <= precision:
+            break
+
+    return name, num_opponents, [wins, ties, trials]
+
+
+# ------ CHECKPOINTS -------
+
+def write_json(path, data):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+def load_checkpoint(path, precision):
+    if not os.path.exists(path):
+        return {"precision": precision, "entries": {}}
+
+    with open(path) as f:
+        checkpoint = json.load(f)
+
+    if checkpoint["precision"] != precision:
+        raise ValueError(
+            f"{path} was started with precision {checkpoint['precision']}, not {precision}"
+        )
+    return checkpoint
+
+
+def generate_chart(path, precision=0.002, classes=None, opponents=None,
+                   workers=None, max_trials=1_000_000, seed=0):
+    """
+    Compute every missing (class, opponents) entry, checkpointing to
+    path + ".partial" as entries finish, then write the chart to path.
+    Entries already in a chart at path are kept, so later runs only add
+    the classes / opponent counts it does not have yet.
+    """
+    if classes is None:
+        classes = HAND_CLASSES
+    if opponents is None:
+        opponents = range(1, MAX_OPPONENTS + 1)
+
+    checkpoint_path = path + ".partial"
+    checkpoint = load_checkpoint(checkpoint_path, precision)
+    entries = checkpoint["entries"]
+
+    if os.path.exists(path):
+        existing = PreflopChart.load(path)
+        if existing.precision != precision:
+            raise ValueError(
+                f"{path} was computed with precision {existing.precision}, not {precision}"
+            )
+        for key, counts in existing.entries.items():
+            entries.setdefault(key, counts)
+
+    pending = [
+        (name, n) for n in opponents for name in classes
+        if f"{name}/{n}" not in entries
+    ]
+
+    start = time()
+
+    if pending:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(chart_entry, name, n, precision, max_trials, seed)
+                for name, n in pending
+            ]
+            for future in as_completed(futures):
+                name, n, counts = future.result()
+                entries[f"{name}/{n}"] = counts
+                write_json(checkpoint_path, checkpoint)
+
+    chart = PreflopChart.from_entries(entries, precision)
+    chart.save(path)
+    if os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+
+    return chart, time() - start
+
+
+# ------ LOOKUP -------
+
+class PreflopChart:
+
+    def __init__(self, precision, win, tie, entries=None):
+        self.precision = precision
+        # win[name][num_opponents - 1], same for tie; None where not computed
+        self.win = win
+        self.tie = tie
+        # raw [wins, ties, trials] per "class/opponents", what later runs extend
+        self.entries = entries or {}
+
+    @classmethod
+    def from_entries(cls, entries, precision):
+        win = {name: [None] * MAX_OPPONENTS for name in HAND_CLASSES}
+        tie = {name: [None] * MAX_OPPONENTS for name in HAND_CLASSES}
+
+        for key, (wins, ties, trials) in entries.items():
+            name, n = key.split("/")
+            win[name][int(n) - 1] = wins / trials
+            tie[name][int(n) - 1] = ties / trials
+
+        return cls(precision, win, tie, entries)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            data = json.load(f)
+
+        if data.get("version") != CHART_VERSION:
+            raise ValueError(
+                f"{path} is chart version {data.get('version')}, expected {CHART_VERSION}"
+            )
+
+        win = dict(zip(data["classes"], data["win"]))
+        tie = dict(zip(data["classes"], data["tie"]))
+        return cls(data["precision"], win, tie, data["entries"])
+
+    def save(self, path):
+        # one row of 9 rounded values per class keeps the file small
+        digits = max(4, 1 - math.floor(math.log10(self.precision)))
+
+        def row(values):
+            return [None if v is None else round(v, digits) for v in values]
+
+        write_json(path, {
+            "version": CHART_VERSION,
+            "precision": self.precision,
+            "opponents": MAX_OPPONENTS,
+            "classes": HAND_CLASSES,
+            "win": [row(self.win[name]) for name in HAND_CLASSES],
+            "tie": [row(self.tie[name]) for name in HAND_CLASSES],
+            "entries": self.entries,
+        })
+
+    def publish(self, registry, name="preflop_chart"):
+        """
+        Share the chart with a worker pool through a
+        shared_tables.TableRegistry; workers rebuild it with attach().
+        """
+        # win rows then tie rows, one value per (class, opponents), NaN if missing
+        values = array("d", (
+            math.nan if v is None else v
+            for rows in (self.win, self.tie)
+            for name in HAND_CLASSES
+            for v in rows[name]
+        ))
+        spec = registry.publish(name, values)
+        spec["precision"] = self.precision
+        return spec
+
+    @classmethod
+    def attach(cls, spec):
+        """
+        Chart backed by a published table; the rows are zero-copy slices.
+        """
+        flat = shared_tables.attach(spec, use_numpy=False)
+        n = MAX_OPPONENTS
+        ties = len(HAND_CLASSES) * n
+
+        win = {name: flat[i * n:(i + 1) * n] for i, name in enumerate(HAND_CLASSES)}
+        tie = {name: flat[ties + i * n:ties + (i + 1) * n] for i, name in enumerate(HAND_CLASSES)}
+        return cls(spec["precision"], win, tie)
+
+    def lookup(self, hero_cards, num_opponents):
+        """
+        Win / tie / loss against random opponents, or None when the chart
+        has no entry for this spot.
+        """
+        if len(hero_cards) != 2 or not 1 <= num_opponents <= MAX_OPPONENTS:
+            return None
+
+        name = hand_class(hero_cards)
+        win = self.win[name][num_opponents - 1]
+        tie = self.tie[name][num_opponents - 1]
+        if win is None or math.isnan(win):
+            return None
+
+        return {
+            "win": win,
+            "tie": tie,
+            "loss": 1 - win - tie
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Preflop equity chart generator")
+    parser.add_argument("path")
+    parser.add_argument("--precision", type=float, default=0.002)
+    parser.add_argument("--opponents", type=int, nargs="+", default=None)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    chart, seconds = generate_chart(
+        args.path,
+        precision=args.precision,
+        opponents=args.opponents,
+        workers=args.workers,
+        seed=args.seed
+    )
+    print(f"Wrote {args.path} in {seconds:.1f} seconds")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+# hand ranges in the usual notation, e.g. "TT+, AKs, KQo, 98s-54s, AQs:0.5".
+#
+# a range is compiled once into flat arrays: the combo id of every hand
+# (0..1325, one per pair of cards), its weight, and a 52-bit mask of the two
+# cards it blocks. compiled ranges are kept in an LRU cache keyed by the
+# normalized string, so repeat queries skip parsing and expansion entirely.
+import itertools
+import random
+import re
+from array import array
+from bisect import bisect_right
+from functools import lru_cache
+
+# card id = rank index * 4 + suit index
+RANKS = "23456789TJQKA"
+SUITS = "HCSD"
+
+RANGE_CACHE_SIZE = 256
+
+# boards remembered per compiled range by CompiledRange.live
+LIVE_CACHE_SIZE = 64
+
+MAX_SAMPLE_TRIES = 10_000
+
+COMBO_CARDS = list(itertools.combinations(range(52), 2))
+COMBO_MASKS = [(1 << a) | (1 << b) for a, b in COMBO_CARDS]
+
+CLASS_TOKEN = re.compile(r"^([2-9TJQKA])([2-9TJQKA])([so]?)(\+?)$")
+COMBO_TOKEN = re.compile(r"^([2-9TJQKA])([hcsd])([2-9TJQKA])([hcsd])$")
+
+
+# ------ CARDS -------
+
+def card_id(card):
+    return RANKS.index(card.rank) * 4 + SUITS.index(card.suit)
+
+
+def cards_mask(cards):
+    mask = 0
+    for c in cards:
+        mask |= 1 << card_id(c)
+    return mask
+
+
+def combo_id(a, b):
+    if a > b:
+        a, b = b, a
+    # pairs that start below a, then the offset of b after a
+    return a * (103 - a) // 2 + (b - a - 1)
+
+
+# ------ PARSING -------
+
+def normalize(text):
+    """
+    Canonical spelling of a range: one token per comma, no spaces,
+    upper-case ranks, lower-case s/o and suits, and no ":1" weights.
+    """
+    tokens = []
+    for token in text.split(","):
+        token = token.strip()
+        if not token:
+            continue
+
+        hand, _, weight = token.partition(":")
+        hand = "".join(
+            ch.upper() if ch.upper() in RANKS else ch.lower()
+            for ch in hand.replace(" ", "")
+        )
+
+        if weight:
+            w = float(weight)
+            if not 0 <= w <= 1:
+                raise ValueError(f"weight must be between 0 and 1 in {token!r}")
+            if w != 1:
+                hand += f":{w:g}"
+        tokens.append(hand)
+
+    return ",".join(tokens)
+
+
+def class_combos(high, low, kind):
+    """
+    Combo ids of a hand class; high / low are rank indexes, kind is
+    "s", "o" or "" for both.
+    """
+    combos = []
+    for s1 in range(4):
+        for s2 in range(4):
+            a = high * 4 + s1
+            b = low * 4 + s2
+            if high == low:
+                if s1 >= s2:
+                    continue
+            elif kind == "s" and s1 != s2:
+                continue
+            elif kind == "o" and s1 == s2:
+                continue
+            combos.append(combo_id(a, b))
+    return combos
+
+
+def parse_class(token):
+    m = CLASS_TOKEN.match(token)
+    if not m:
+        raise ValueError(f"cannot parse hand {token!r}")
+
+    high, low = RANKS.index(m.group(1)), RANKS.index(m.group(2))
+    if low > high:
+        high, low = low, high
+    kind = m.group(3)
+    if high == low and kind:
+        raise ValueError(f"pairs cannot be suited or offsuit: {token!r}")
+    return high, low, kind, bool(m.group(4))
+
+
+def expand_token(token):
+    m = COMBO_TOKEN.match(token)
+    if m:
+        a = RANKS.index(m.group(1)) * 4 + SUITS.index(m.group(2).upper())
+        b = RANKS.index(m.group(3)) * 4 + SUITS.index(m.group(4).upper())
+        if a == b:
+            raise ValueError(f"combo uses the same card twice: {token!r}")
+        return [combo_id(a, b)]
+
+    if "-" in token:
+        first, last = token.split("-")
+        h1, l1, k1, plus1 = parse_class(first)
+        h2, l2, k2, plus2 = parse_class(last)
+        if plus1 or plus2 or k1 != k2:
+            raise ValueError(f"cannot parse range {token!r}")
+
+        if h1 == l1 and h2 == l2:
+            # "TT-77"
+            steps = [(r, r) for r in range(min(h1, h2), max(h1, h2) + 1)]
+        elif h1 == h2:
+            # "A9s-A2s"
+            steps = [(h1, r) for r in range(min(l1, l2), max(l1, l2) + 1)]
+        elif h1 - l1 == h2 - l2:
+            # "98s-54s"
+            gap = h1 - l1
+            steps = [(r, r - gap) for r in range(min(h1, h2), max(h1, h2) + 1)]
+        else:
+            raise ValueError(f"cannot parse range {token!r}")
+
+        return [c for high, low in steps for c in class_combos(high, low, k1)]
+
+    high, low, kind, plus = parse_class(token)
+    if not plus:
+        return class_combos(high, low, kind)
+
+    if high == low:
+        # "TT+"
+        steps = [(r, r) for r in range(high, len(RANKS))]
+    else:
+        # "ATs+": raise the kicker up to just below the top card
+        steps = [(high, r) for r in range(low, high)]
+
+    return [c for h, l in steps for c in class_combos(h, l, kind)]
+
+
+# ------ COMPILED RANGES -------
+
+class CompiledRange:
+
+    def __init__(self, text, combo_ids, weights):
+        self.text = text
+        self.combo_ids = array("H", combo_ids)
+        self.weights = array("d", weights)
+        self.masks = array("Q", (COMBO_MASKS[c] for c in combo_ids))
+        self._live = {}
+        self._cumulative = None
+
+    def __len__(self):
+        return len(self.combo_ids)
+
+    def __repr__(self):
+        return f"CompiledRange({self.text!r}, {len(self)} combos)"
+
+    def live(self, dead_mask):
+        """
+        The part of the range that does not touch any dead card (board,
+        hero's hole cards). Remembered per mask.
+        """
+        if dead_mask in self._live:
+            return self._live[dead_mask]
+
+        keep = [i for i, m in enumerate(self.masks) if not m & dead_mask]
+        live = CompiledRange(
+            self.text,
+            [self.combo_ids[i] for i in keep],
+            [self.weights[i] for i in keep]
+        )
+
+        if len(self._live) >= LIVE_CACHE_SIZE:
+            self._live.clear()
+        self._live[dead_mask] = live
+        return live
+
+    def card_pairs(self):
+        return [COMBO_CARDS[c] for c in self.combo_ids]
+
+    def sample(self, rng=random):
+        """
+        Index of a combo drawn in proportion to its weight.
+        """
+        if self._cumulative is None:
+            total = 0.0
+            self._cumulative = array("d")
+            for w in self.weights:
+                total += w
+                self._cumulative.append(total)
+
+        if not self._cumulative or self._cumulative[-1] <= 0:
+            raise ValueError(f"range {self.text!r} has no live combos")
+
+        x = rng.random() * self._cumulative[-1]
+        return min(bisect_right(self._cumulative, x), len(self) - 1)
+
+
+@lru_cache(maxsize=RANGE_CACHE_SIZE)
+def _compile(normalized):
+    weights = {}
+    for token in normalized.split(","):
+        if not token:
+            continue
+        hand, _, weight = token.partition(":")
+        w = float(weight) if weight else 1.0
+        # later tokens override earlier ones for the same combo
+        for c in expand_token(hand):
+            weights[c] = w
+
+    combo_ids = sorted(c for c, w in weights.items() if w > 0)
+    return CompiledRange(normalized, combo_ids, [weights[c] for c in combo_ids])
+
+
+def compile_range(text):
+    """
+    Compiled range for a range string (or an already compiled range).
+    """
+    if isinstance(text, CompiledRange):
+        return text
+    return _compile(normalize(text))
+
+
+def sample_opponents(ranges, rng=random):
+    """
+    One combo per range with no card shared between them, as card id pairs.
+    Conflicting draws are thrown away together so the result follows the
+    joint distribution of the ranges.
+    """
+    for _ in range(MAX_SAMPLE_TRIES):
+        used = 0
+        picks = []
+        for r in ranges:
+            i = r.sample(rng)
+            mask = r.masks[i]
+            if mask & used:
+                break
+            used |= mask
+            picks.append(COMBO_CARDS[r.combo_ids[i]])
+        else:
+            return picks, used
+
+    raise ValueError("could not deal disjoint hands from these ranges")
@@ -0,0 +1,253 @@
+# split an exact heads-up enumeration into deterministic shards so a long job
+# can be resumed after a crash or fanned out across processes / machines.
+#
+# a job is a directory holding job.json (hero, board, number of shards) and
+# one small shard-XXXX.json per finished shard with its partial counts.
+# shard i covers every num_shards-th opponent combo starting at i, in the
+# order Game.opponent_combos produces, so any machine computes the same split.
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from time import time
+from equity import Game, all_cards
+from hand import Card
+
+JOB_FILE = "job.json"
+
+
+# ------ HELPERS -------
+
+def card_str(card):
+    return f"{card.rank}{card.suit}"
+
+
+def parse_cards(card_strs):
+    return [Card(rank=s[0], suit=s[1:]) for s in card_strs]
+
+
+DECK = {card_str(c) for c in all_cards}
+
+
+def normalize_cards(card_strs, seen=None):
+    """
+    Upper-case card strings ("Ah" -> "AH") and check each is a real card
+    that is not already in seen, which collects them.
+    """
+    if seen is None:
+        seen = set()
+
+    cards = []
+    for s in card_strs:
+        card = s.strip().upper()
+        if card not in DECK:
+            raise ValueError(f"unknown card {s!r}")
+        if card in seen:
+            raise ValueError(f"card {card} is used twice")
+        seen.add(card)
+        cards.append(card)
+    return cards
+
+
+def shard_path(job_dir, shard):
+    return os.path.join(job_dir, f"shard-{shard:04d}.json")
+
+
+def write_json(path, data):
+    # write then rename so a crash never leaves a half-written shard behind
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+
+def read_json(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+# ------ JOBS -------
+
+def create_job(job_dir, hero, board, num_shards):
+    """
+    Create (or reopen) a job directory. hero / board are card strings like "AH".
+    Reopening with different parameters is an error rather than a silent mix.
+    """
+    # checked before anything is written: a card missing from the deck would
+    # stay in it and be dealt to the opponent
+    seen = set()
+    hero = normalize_cards(hero, seen)
+    board = normalize_cards(board, seen)
+    if len(hero) != 2:
+        raise ValueError(f"hero needs 2 cards, got {len(hero)}")
+    if len(board) not in (0, 3, 4, 5):
+        raise ValueError(f"board needs 0, 3, 4 or 5 cards, got {len(board)}")
+
+    job = {
+        "hero": hero,
+        "board": board,
+        "num_shards": num_shards,
+    }
+
+    os.makedirs(job_dir, exist_ok=True)
+    path = os.path.join(job_dir, JOB_FILE)
+
+    if os.path.exists(path):
+        existing = read_json(path)
+        if existing != job:
+            raise ValueError(f"{job_dir} already holds a different job: {existing}")
+        return job
+
+    write_json(path, job)
+    return job
+
+
+def load_job(job_dir):
+    return read_json(os.path.join(job_dir, JOB_FILE))
+
+
+def done_shards(job_dir, num_shards):
+    return [s for s in range(num_shards) if os.path.exists(shard_path(job_dir, s))]
+
+
+def pending_shards(job_dir, num_shards):
+    done = set(done_shards(job_dir, num_shards))
+    return [s for s in range(num_shards) if s not in done]
+
+
+def run_shard(job_dir, shard):
+    """
+    Compute a single shard and write its counts. Safe to call from any
+    process or machine that can see job_dir.
+    """
+    job = load_job(job_dir)
+    game = Game(all_cards)
+
+    start = time()
+    counts = game.exact_equity_shard(
+        parse_cards(job["hero"]),
+        parse_cards(job["board"]),
+        shard,
+        job["num_shards"]
+    )
+
+    write_json(shard_path(job_dir, shard), {
+        "shard": shard,
+        "num_shards": job["num_shards"],
+        "seconds": time() - start,
+        **counts,
+    })
+    return counts
+
+
+def merge_shards(job_dir):
+    """
+    Combine every shard's counts. Raises if any shard is still missing.
+    """
+    job = load_job(job_dir)
+    missing = pending_shards(job_dir, job["num_shards"])
+    if missing:
+        raise ValueError(f"{len(missing)} shard(s) not finished yet, e.g. {missing[:5]}")
+
+    wins = 0
+    losses = 0
+    ties = 0
+    seconds = 0.0
+
+    for s in range(job["num_shards"]):
+        shard = read_json(shard_path(job_dir, s))
+        wins += shard["wins"]
+        losses += shard["losses"]
+        ties += shard["ties"]
+        seconds += shard["seconds"]
+
+    total = wins + losses + ties
+
+    return {
+        "equity": wins / total,
+        "wins": wins,
+        "losses": losses,
+        "ties": ties,
+        "total": total,
+        "seconds": seconds
+    }
+
+
+def run_local(job_dir, hero, board, num_shards, workers=None):
+    """
+    Run every unfinished shard of a job in a local process pool and merge.
+    Already finished shards are skipped, so rerunning resumes the job.
+    """
+    create_job(job_dir, hero, board, num_shards)
+    pending = pending_shards(job_dir, num_shards)
+
+    if pending:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(run_shard, job_dir, s) for s in pending]
+            for future in as_completed(futures):
+                future.result()
+
+    return merge_shards(job_dir)
+
+
+# ------ CLI -------
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sharded exact heads-up equity")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="run all pending shards locally, then merge")
+    run.add_argument("job_dir")
+    run.add_argument("--hero", nargs=2, required=True)
+    run.add_argument("--board", nargs="*", default=[])
+    run.add_argument("--shards", type=int, default=64)
+    run.add_argument("--workers", type=int, default=None)
+
+    init = sub.add_parser("init", help="create a job directory for a cluster run")
+    init.add_argument("job_dir")
+    init.add_argument("--hero", nargs=2, required=True)
+    init.add_argument("--board", nargs="*", default=[])
+    init.add_argument("--shards", type=int, default=64)
+
+    shard = sub.add_parser("shard", help="compute one shard, e.g. one cluster task")
+    shard.add_argument("job_dir")
+    shard.add_argument("index", type=int)
+
+    status = sub.add_parser("pending", help="list shards that still need to run")
+    status.add_argument("job_dir")
+
+    merge = sub.add_parser("merge", help="combine finished shards")
+    merge.add_argument("job_dir")
+
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command in ("run", "init"):
+            create_job(args.job_dir, args.hero, args.board, args.shards)
+    except ValueError as e:
+        parser.error(str(e))
+
+    if args.command == "run":
+        result = run_local(args.job_dir, args.hero, args.board, args.shards, args.workers)
+    elif args.command == "init":
+        return
+    elif args.command == "shard":
+        run_shard(args.job_dir, args.index)
+        return
+    elif args.command == "pending":
+        job = load_job(args.job_dir)
+        print(" ".join(str(s) for s in pending_shards(args.job_dir, job["num_shards"])))
+        return
+    else:
+        result = merge_shards(args.job_dir)
+
+    print(f"Equity:  {result['equity']:.4f}")
+    print(f"Wins:    {result['wins']}")
+    print(f"Losses:  {result['losses']}")
+    print(f"Ties:    {result['ties']}")
+    print(f"Total:   {result['total']}")
+    print(f"Time:    {result['seconds']:.2f} CPU seconds")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+# read-only lookup tables (evaluator tables, equity charts) shared with a
+# worker pool. the parent publishes each table once into shared memory, or
+# points at a file on disk, and hands the small picklable specs to the pool;
+# workers attach zero-copy instead of loading or rebuilding their own copy.
+#
+#   with TableRegistry() as registry:
+#       specs = [registry.publish("chart", chart_array)]
+#       with ProcessPoolExecutor(initializer=init_worker, initargs=(specs,)) as pool:
+#           ...                          # workers call get_table("chart")
+#
+# workers should be children of the publishing process (any pool is): they
+# share its resource tracker, so attaching never takes ownership of a segment.
+# the registry unlinks its segments on close / exit, and every new registry
+# first removes segments left behind by publishers that crashed.
+import atexit
+import json
+import mmap
+import os
+import secrets
+import struct
+import tempfile
+from multiprocessing import shared_memory
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# one manifest per live registry: owner pid and the segments it created
+MANIFEST_DIR = os.path.join(tempfile.gettempdir(), "progue-tables")
+
+# tables attached in this process, by name
+_attached = {}
+
+
+# ------ LIFECYCLE -------
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _unlink_segment(segment):
+    try:
+        shm = shared_memory.SharedMemory(name=segment)
+    except FileNotFoundError:
+        return
+    shm.close()
+    shm.unlink()
+
+
+def cleanup_stale(manifest_dir=MANIFEST_DIR):
+    """
+    Unlink segments of registries whose owner process is gone.
+    Returns the number of segments removed.
+    """
+    if not os.path.isdir(manifest_dir):
+        return 0
+
+    removed = 0
+    for entry in os.listdir(manifest_dir):
+        path = os.path.join(manifest_dir, entry)
+        try:
+            with open(path) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            continue
+
+        if _pid_alive(manifest["pid"]):
+            continue
+
+        for segment in manifest["segments"]:
+            _unlink_segment(segment)
+            removed += 1
+        os.remove(path)
+
+    return removed
+
+
+# ------ PUBLISHING -------
+
+class TableRegistry:
+
+    def __init__(self, manifest_dir=MANIFEST_DIR):
+        cleanup_stale(manifest_dir)
+        os.makedirs(manifest_dir, exist_ok=True)
+
+        # short: some platforms cap segment names at 31 characters
+        self.prefix = f"pt{os.getpid()}_{secrets.token_hex(3)}"
+        self.specs = {}
+        self._segments = []
+        self._manifest = os.path.join(manifest_dir, f"{self.prefix}.json")
+        self._closed = False
+
+        atexit.register(self.close)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _write_manifest(self):
+        tmp = f"{self._manifest}.tmp"
+        with open(tmp, "w") as f:
+            json.dump({
+                "pid": os.getpid(),
+                "segments": [shm.name for shm in self._segments],
+            }, f)
+        os.replace(tmp, self._manifest)
+
+    def publish(self, name, data, shape=None):
+        """
+        Copy data (an array.array, numpy array or anything exposing the
+        buffer protocol) into a new shared segment. Returns its spec.
+        """
+        if name in self.specs:
+            raise ValueError(f"table {name!r} is already published")
+
+        view = memoryview(data)
+        raw = view.cast("B") if view.c_contiguous else memoryview(bytes(view))
+
+        shm = shared_memory.SharedMemory(
+            create=True,
+            size=max(raw.nbytes, 1),
+            name=f"{self.prefix}_{len(self._segments)}"
+        )
+        shm.buf[:raw.nbytes] = raw
+        self._segments.append(shm)
+        self._write_manifest()
+
+        spec = {
+            "name": name,
+            "segment": shm.name,
+            "format": view.format,
+            "nbytes": raw.nbytes,
+            "shape": list(shape or view.shape),
+        }
+        self.specs[name] = spec
+        return spec
+
+    def publish_file(self, name, path, fmt, shape=None, offset=0):
+        """
+        Share a table that already sits in a file; workers map it read-only.
+        """
+        if name in self.specs:
+            raise ValueError(f"table {name!r} is already published")
+
+        itemsize = struct.calcsize(fmt)
+        length = (os.path.getsize(path) - offset) // itemsize
+        spec = {
+            "name": name,
+            "path": os.path.abspath(path),
+            "offset": offset,
+            "format": fmt,
+            "nbytes": length * itemsize,
+            "shape": list(shape or [length]),
+        }
+        self.specs[name] = spec
+        return spec
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+
+        for shm in self._segments:
+            try:
+                shm.close()
+            except BufferError:
+                # views attached in this process keep the mapping alive,
+                # the segment itself still goes away
+                pass
+            try:
+                shm.unlink()
+            except FileNotFoundError:
+                pass
+
+        if os.path.exists(self._manifest):
+            os.remove(self._manifest)
+        atexit.unregister(self.close)
+
+
+# ------ ATTACHING -------
+
+def attach(spec, use_numpy=True):
+    """
+    Read-only, zero-copy view of a published table: a numpy array when
+    numpy is installed (and use_numpy), otherwise a memoryview.
+    """
+    if "segment" in spec:
+        shm = shared_memory.SharedMemory(name=spec["segment"])
+        owner = shm
+        buf = shm.buf[:spec["nbytes"]]
+    else:
+        with open(spec["path"], "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        owner = mm
+        start = spec["offset"]
+        buf = memoryview(mm)[start:start + spec["nbytes"]]
+
+    view = buf.toreadonly().cast(spec["format"], spec["shape"])
+
+    if use_numpy and numpy is not None:
+        table = numpy.frombuffer(view, dtype=spec["format"]).reshape(spec["shape"])
+    else:
+        table = view
+
+    # keep the mapping open for as long as this process holds the table
+    _attached[spec["name"]] = (owner, table)
+    return table
+
+
+def init_worker(specs, use_numpy=True):
+    """
+    Pool initializer: attach every published table once per worker.
+    """
+    for spec in specs:
+        attach(spec, use_numpy)
+
+
+def detach(name):
+    """
+    Drop this process's view of a table and close its mapping.
+    """
+    owner, table = _attached.pop(name)
+    if isinstance(table, memoryview):
+        table.release()
+    del table
+    try:
+        owner.close()
+    except BufferError:
+        # something else in this process still holds a view
+        pass
+
+
+def get_table(name):
+    try:
+        return _attached[name][1]
+    except KeyError:
+        raise KeyError(f"table {name!r} is not attached in this process") from None
@@ -1,6 +1,7 @@
 import random
 from typing import List
-from hand import Card, Hand
+from hand import Card, HandState, HAND_STRENGTH
+from ranges import card_id, cards_mask, compile_range, sample_opponents
 
 # =========================
 # CONFIGURATION
@@ -14,8 +15,10 @@ NUM_TRIALS = 7500   # adjust for speed vs accuracy
 # =========================
 
 class MonteCarloSimulator:
-    def __init__(self, all_cards: List[Card]):
+    def __init__(self, all_cards: List[Card], preflop_chart=None):
         self.all_cards = all_cards
+        # optional preflop.PreflopChart, consulted while the board is empty
+        self.preflop_chart = preflop_chart
 
     def remaining_deck(self, used_cards: List[Card]) -> List[Card]:
         used = {(c.rank, c.suit) for c in used_cards}
@@ -29,24 +32,38 @@ class MonteCarloSimulator:
         hero_cards: List[Card],
         board_cards: List[Card] = None,
         num_opponents: int = 1,
-        trials: int = NUM_TRIALS
+        trials: int = NUM_TRIALS,
+        opponent_ranges=None
     ):
         """
         Monte Carlo equity estimation.
         Returns win / tie / loss probabilities.
+        Opponents hold any two cards unless opponent_ranges gives a range
+        (string or ranges.CompiledRange) for all of them, or one each.
         """
         if board_cards is None:
             board_cards = []
 
+        if opponent_ranges is not None:
+            return self.estimate_equity_vs_ranges(
+                hero_cards, board_cards, num_opponents, trials, opponent_ranges
+            )
+
+        # ---- Precomputed preflop equity ----
+        if not board_cards and self.preflop_chart is not None:
+            result = self.preflop_chart.lookup(hero_cards, num_opponents)
+            if result is not None:
+                return result
+
         wins = 0
         ties = 0
         losses = 0
 
-        for _ in range(trials):
-            # ---- Build deck ----
-            used_cards = hero_cards + board_cards
-            deck = self.remaining_deck(used_cards)
+        # ---- Build deck ----
+        used_cards = hero_cards + board_cards
+        deck = self.remaining_deck(used_cards)
 
+        for _ in range(trials):
             # ---- Shuffle once ----
             random.shuffle(deck)
 
@@ -60,33 +77,15 @@ class MonteCarloSimulator:
             # ---- Complete board ----
             needed = 5 - len(board_cards)
             board_rest = deck[idx:idx+needed]
-            full_board = board_cards + board_rest
-
-            # ---- Evaluate hero ----
-            hero_hand = Hand(hero_cards + full_board).get_hand()
-
-            # ---- Evaluate opponents ----
-            opp_hands = [
-                Hand(opp + full_board).get_hand()
-                for opp in opponents
-            ]
-
-            # ---- Determine best hand ----
-            best_hand = hero_hand
-            tied = False
-
-            for opp_hand in opp_hands:
-                if opp_hand > best_hand:
-                    best_hand = opp_hand
-                    tied = False
-                elif opp_hand == best_hand:
-                    tied = True
-
-            if best_hand == hero_hand:
-                if tied:
-                    ties += 1
-                else:
-                    wins += 1
+            board_state = HandState(board_cards + board_rest)
+
+            # ---- Showdown ----
+            outcome = self.showdown(board_state, hero_cards, opponents)
+
+            if outcome == "win":
+                wins += 1
+            elif outcome == "tie":
+                ties += 1
             else:
                 losses += 1
 
@@ -96,6 +95,98 @@ class MonteCarloSimulator:
             "loss": losses / trials
         }
 
+    def estimate_equity_vs_ranges(
+        self,
+        hero_cards: List[Card],
+        board_cards: List[Card],
+        num_opponents: int,
+        trials: int,
+        opponent_ranges
+    ):
+        if isinstance(opponent_ranges, (list, tuple)):
+            if len(opponent_ranges) != num_opponents:
+                raise ValueError(
+                    f"got {len(opponent_ranges)} ranges for {num_opponents} opponents"
+                )
+        else:
+            opponent_ranges = [opponent_ranges] * num_opponents
+
+        # ---- Filter ranges by the known cards ----
+        used_cards = hero_cards + board_cards
+        dead = cards_mask(used_cards)
+        ranges = [compile_range(r).live(dead) for r in opponent_ranges]
+
+        deck = self.remaining_deck(used_cards)
+        by_id = {card_id(c): c for c in deck}
+        needed = 5 - len(board_cards)
+
+        wins = 0
+        ties = 0
+        losses = 0
+
+        for _ in range(trials):
+            # ---- Deal opponent hands from their ranges ----
+            picks, opp_mask = sample_opponents(ranges)
+            opponents = [[by_id[a], by_id[b]] for a, b in picks]
+
+            # ---- Complete board ----
+            live = [c for c in deck if not opp_mask >> card_id(c) & 1]
+            board_state = HandState(board_cards + random.sample(live, needed))
+
+            # ---- Showdown ----
+            outcome = self.showdown(board_state, hero_cards, opponents)
+
+            if outcome == "win":
+                wins += 1
+            elif outcome == "tie":
+                ties += 1
+            else:
+                losses += 1
+
+        return {
+            "win": wins / trials,
+            "tie": ties / trials,
+            "loss": losses / trials
+        }
+
+    def showdown(self, board_state: HandState, hero_cards: List[Card],
+                 opponents: List[List[Card]]) -> str:
+        """
+        "win", "tie" or "loss" for hero on a complete board.
+        The board is analyzed once in board_state; every player is scored by
+        merging just their two hole cards into it and taking them out again.
+        Ranks are only built when two players share a category, and the
+        first opponent who beats hero ends the showdown.
+        """
+        for c in hero_cards:
+            board_state.add_card(c)
+        hero_strength = HAND_STRENGTH[board_state.category]
+        hero_ranks = board_state.get_ranks()
+        for c in hero_cards:
+            board_state.remove_card(c)
+
+        tied = False
+
+        for opp in opponents:
+            for c in opp:
+                board_state.add_card(c)
+
+            strength = HAND_STRENGTH[board_state.category]
+            if strength == hero_strength:
+                ranks = board_state.get_ranks()
+                beaten = ranks > hero_ranks
+                tied = tied or ranks == hero_ranks
+            else:
+                beaten = strength < hero_strength
+
+            for c in opp:
+                board_state.remove_card(c)
+
+            if beaten:
+                return "loss"
+
+        return "tie" if tied else "win"
+
 
 # =========================
 # QUICK RUNNER
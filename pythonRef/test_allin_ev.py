@@ -0,0 +1,249 @@
+import json
+import os
+import tempfile
+import unittest
+from allin_ev import MAX_HAND_LINES, canonicalize, iter_hands, parse_spot, run_pipeline
+from equity import Game, all_cards
+from shards import parse_cards
+
+
+FLOP_ALLIN = """PokerStars Hand #1001: Hold'em No Limit ($0.50/$1.00 USD) - 2024/01/01 12:00:00 ET
+Table 'Alpha' 6-max Seat #1 is the button
+Seat 1: alice ($100 in chips)
+Seat 2: bob ($100 in chips)
+alice: posts small blind $0.50
+bob: posts big blind $1
+*** HOLE CARDS ***
+Dealt to alice [Ah Kh]
+alice: raises $2 to $3
+bob: calls $2
+*** FLOP *** [2c 7d Jh]
+bob: checks
+alice: bets $97 and is all-in
+bob: calls $97 and is all-in
+*** TURN *** [2c 7d Jh] [Qs]
+*** RIVER *** [2c 7d Jh Qs] [3h]
+*** SHOW DOWN ***
+alice: shows [Ah Kh] (high card Ace)
+bob: shows [Qc Qd] (three of a kind, Queens)
+bob collected $199 from pot
+*** SUMMARY ***
+Total pot $200 | Rake $1
+Board [2c 7d Jh Qs 3h]
+Seat 1: alice (button) (small blind) showed [Ah Kh] and lost with high card Ace
+Seat 2: bob (big blind) showed [Qc Qd] and won ($199) with three of a kind, Queens
+"""
+
+# the same spot with hearts and spades swapped and bob's cards reordered
+FLOP_ALLIN_ISOMORPHIC = (
+    FLOP_ALLIN
+    .replace("#1001", "#1002")
+    .replace("bob: shows [Qc Qd]", "bob: shows [Qd Qc]")
+    .replace("Ah Kh", "As Ks")
+    .replace("[2c 7d Jh]", "[2c 7d Js]")
+)
+
+NO_ALLIN = """PokerStars Hand #1003: Hold'em No Limit ($0.50/$1.00 USD) - 2024/01/01 12:05:00 ET
+Seat 1: alice ($100 in chips)
+Seat 2: bob ($100 in chips)
+alice: posts small blind $0.50
+bob: posts big blind $1
+*** HOLE CARDS ***
+alice: folds
+bob collected $1 from pot
+*** SUMMARY ***
+Total pot $1 | Rake $0
+"""
+
+SIDE_POT = """PokerStars Hand #1004: Hold'em No Limit ($0.50/$1.00 USD) - 2024/01/01 12:10:00 ET
+*** HOLE CARDS ***
+alice: raises $20 to $21 and is all-in
+bob: calls $21
+carol: calls $50 and is all-in
+*** FLOP *** [2c 7d Jh]
+*** TURN *** [2c 7d Jh] [Qs]
+*** RIVER *** [2c 7d Jh Qs] [3h]
+*** SHOW DOWN ***
+alice: shows [Ah Kh] (high card Ace)
+bob: shows [Qc Qd] (three of a kind, Queens)
+carol: shows [9c 9d] (a pair of Nines)
+*** SUMMARY ***
+Total pot $101 Main pot $63. Side pot $38. | Rake $0
+"""
+
+# one pot, three players: the callers check every street after the shove
+CHECKED_DOWN = """PokerStars Hand #1005: Hold'em No Limit ($0.50/$1.00 USD) - 2024/01/01 12:15:00 ET
+Seat 1: alice ($20 in chips)
+Seat 2: bob ($100 in chips)
+Seat 3: carol ($100 in chips)
+bob: posts small blind $0.50
+carol: posts big blind $1
+*** HOLE CARDS ***
+alice: raises $19 to $20 and is all-in
+bob: calls $19.50
+carol: calls $19
+*** FLOP *** [2c 7d Jh]
+bob: checks
+carol: checks
+*** TURN *** [2c 7d Jh] [Qs]
+bob: checks
+carol: checks
+*** RIVER *** [2c 7d Jh Qs] [3h]
+bob: checks
+carol: checks
+*** SHOW DOWN ***
+alice: shows [Ah Kh] (high card Ace)
+bob: shows [Qc Qd] (three of a kind, Queens)
+carol: shows [9c 9d] (a pair of Nines)
+bob collected $60 from pot
+*** SUMMARY ***
+Total pot $60 | Rake $0
+"""
+
+# zoom and home game headers carry a word before "Hand #"
+ZOOM = (
+    FLOP_ALLIN
+    .replace("PokerStars Hand #1001:", "PokerStars Zoom Hand #2001:")
+)
+HOME_GAME = (
+    NO_ALLIN
+    .replace("PokerStars Hand #1003:", "PokerStars Home Game Hand #2002: {Club #1}")
+)
+
+
+class TestAllinEV(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.history = os.path.join(self.tmp.name, "history.txt")
+        with open(self.history, "w") as f:
+            f.write("\n\n".join([FLOP_ALLIN, NO_ALLIN, FLOP_ALLIN_ISOMORPHIC, SIDE_POT]))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_iter_hands_splits_on_header(self):
+        hands = list(iter_hands([self.history]))
+
+        self.assertEqual(len(hands), 4)
+        self.assertTrue(all(h[0].startswith("PokerStars Hand #") for h in hands))
+
+    def test_iter_hands_other_headers(self):
+        path = os.path.join(self.tmp.name, "zoom.txt")
+        with open(path, "w") as f:
+            f.write("\n\n".join([ZOOM, HOME_GAME, ZOOM.replace("#2001", "#2003")]))
+
+        hands = list(iter_hands([path]))
+
+        self.assertEqual(len(hands), 3)
+        self.assertEqual([parse_spot(h) and parse_spot(h)["hand"] for h in hands],
+                         ["2001", None, "2003"])
+        self.assertEqual(parse_spot(hands[0])["pot"], 199.0)
+
+    def test_iter_hands_drops_overlong_hand(self):
+        path = os.path.join(self.tmp.name, "unknown.txt")
+        with open(path, "w") as f:
+            f.write("Some Other Site Hand #1\n" + "x: checks\n" * (MAX_HAND_LINES + 10))
+            f.write("\n" + FLOP_ALLIN)
+
+        hands = list(iter_hands([path]))
+
+        self.assertEqual(len(hands), 1)
+        self.assertEqual(parse_spot(hands[0])["hand"], "1001")
+
+    def test_parse_spot(self):
+        spot = parse_spot(FLOP_ALLIN.splitlines())
+
+        self.assertEqual(spot["hand"], "1001")
+        self.assertEqual(spot["board"], ["2C", "7D", "JH"])
+        self.assertEqual(spot["pot"], 199.0)
+        self.assertEqual(spot["names"], ["alice", "bob"])
+        self.assertEqual(spot["cards"], [["AH", "KH"], ["QC", "QD"]])
+        self.assertEqual(spot["won"], [0.0, 199.0])
+
+    def test_board_stays_at_allin_when_checked_down(self):
+        spot = parse_spot(CHECKED_DOWN.splitlines())
+
+        self.assertEqual(spot["board"], [])
+        self.assertEqual(spot["names"], ["alice", "bob", "carol"])
+        self.assertEqual(spot["pot"], 60.0)
+
+    def test_skipped_spots(self):
+        self.assertIsNone(parse_spot(NO_ALLIN.splitlines()))
+        self.assertIsNone(parse_spot(SIDE_POT.splitlines()))
+
+    def test_isomorphic_spots_share_a_key(self):
+        a = parse_spot(FLOP_ALLIN.splitlines())
+        b = parse_spot(FLOP_ALLIN_ISOMORPHIC.splitlines())
+
+        key_a, order_a = canonicalize(a["cards"], a["board"])
+        key_b, order_b = canonicalize(b["cards"], b["board"])
+
+        self.assertEqual(key_a, key_b)
+        self.assertEqual(key_a[0][order_a[0]], key_b[0][order_b[0]])
+
+    def test_pipeline_writes_ev_per_hand(self):
+        out = os.path.join(self.tmp.name, "ev.jsonl")
+
+        stats = run_pipeline([self.history], out, workers=2, chunk_hands=2)
+
+        self.assertEqual(stats["hands"], 4)
+        self.assertEqual(stats["spots"], 2)
+        self.assertEqual(stats["solved"], 1)
+
+        with open(out) as f:
+            rows = [json.loads(line) for line in f]
+        self.assertEqual([r["hand"] for r in rows], ["1001", "1002"])
+
+        expected = Game(all_cards).exact_equity_multiway(
+            [parse_cards(["AH", "KH"]), parse_cards(["QC", "QD"])],
+            parse_cards(["2C", "7D", "JH"])
+        )["equities"]
+
+        for row in rows:
+            alice, bob = row["players"]
+            self.assertAlmostEqual(alice["equity"], expected[0], places=6)
+            self.assertAlmostEqual(bob["equity"], expected[1], places=6)
+            self.assertAlmostEqual(alice["ev"] + bob["ev"], 199.0, places=1)
+            self.assertAlmostEqual(bob["adjustment"], bob["ev"] - 199.0, places=1)
+
+
+class TestExactMultiway(unittest.TestCase):
+
+    def test_heads_up_matches_enumeration(self):
+        game = Game(all_cards)
+        hero = parse_cards(["AH", "KH"])
+        villain = parse_cards(["QC", "QD"])
+        board = parse_cards(["2C", "7D", "JH", "QS"])
+
+        result = game.exact_equity_multiway([hero, villain], board)
+
+        # count_vs_combos expects combos built from the game's own deck
+        combo = [
+            combo for combo in game.opponent_combos(hero, board)
+            if {(c.rank, c.suit) for c in combo} == {("Q", "C"), ("Q", "D")}
+        ]
+        counts = game.count_vs_combos(hero, board, combo)
+
+        self.assertEqual(result["total"], counts["total"])
+        self.assertAlmostEqual(
+            result["equities"][0],
+            (counts["wins"] + counts["ties"] / 2) / counts["total"]
+        )
+
+    def test_three_way_equities_sum_to_one(self):
+        game = Game(all_cards)
+        players = [
+            parse_cards(["AH", "KH"]),
+            parse_cards(["QC", "QD"]),
+            parse_cards(["9C", "9D"]),
+        ]
+
+        result = game.exact_equity_multiway(players, parse_cards(["2C", "7D", "JH"]))
+
+        self.assertEqual(result["total"], 903)  # C(43, 2)
+        self.assertAlmostEqual(sum(result["equities"]), 1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+from census import CENSUS_TOTALS, ENGINES, census_unit, minimal_repro, run_census
+from hand import Card, HandResult
+
+
+def make_cards(card_strs):
+    return [Card(rank=s[0], suit=s[1:]) for s in card_strs]
+
+
+# reports every flush as a plain high card hand
+def broken_engine(cards):
+    result = ENGINES["hand"](cards)
+    if result.type == "Flush":
+        return HandResult("High Card", result.cards)
+    return result
+
+
+class TestCensus(unittest.TestCase):
+
+    def setUp(self):
+        ENGINES["broken"] = broken_engine
+
+    def tearDown(self):
+        del ENGINES["broken"]
+
+    def test_known_totals_cover_every_hand(self):
+        self.assertEqual(sum(CENSUS_TOTALS.values()), 133784560)
+
+    def test_small_deck_census_agrees(self):
+        # first 16 cards of the deck: A, 2, 3, 4 in every suit
+        result = run_census(("hand", "state"), deck_size=16, hand_size=7, workers=2)
+
+        self.assertEqual(result["hands"], 11440)  # C(16, 7)
+        self.assertEqual(sum(result["categories"].values()), 11440)
+        self.assertEqual(result["mismatches"], {})
+        self.assertEqual(result["repros"], [])
+        self.assertIsNone(result["expected"])
+        self.assertEqual(set(result["hands_per_sec"]), {"hand", "state"})
+
+    def test_five_card_census_matches_known_frequencies(self):
+        # C(20, 5) hands over A-5: every suited five is a wheel, so the only
+        # flushes are the four steel wheels
+        result = run_census(("hand",), deck_size=20, hand_size=5, workers=2)
+
+        self.assertEqual(result["hands"], 15504)
+        self.assertEqual(result["categories"]["Quads"], 5 * 16)
+        self.assertEqual(result["categories"]["Straight Flush"], 4)
+
+    def test_unit_reports_disagreements(self):
+        result = census_unit((0, 4, 8), 52, 5, ("hand", "broken"))
+
+        self.assertGreater(result["mismatches"]["broken"], 0)
+        self.assertTrue(result["reported"])
+
+    def test_minimal_repro_shrinks_to_the_flush(self):
+        cards = make_cards(["AH", "9H", "7H", "4H", "2H", "KD", "KS"])
+
+        repro = minimal_repro(cards, "broken")
+
+        self.assertEqual(len(repro), 5)
+        self.assertTrue(all(c.suit == "H" for c in repro))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+import itertools
+import random
+import unittest
+from equity import (
+    Game, all_cards, count_allowed_seatings, count_seatings, matching_counter,
+)
+from hand import Card, HandState
+
+
+def make_cards(card_strs):
+    return [Card(rank=s[0], suit=s[1:]) for s in card_strs]
+
+
+# every seating of disjoint pairs drawn from cards, spelled out
+def brute_force_matchings(cards, allowed_pair, k):
+    pairs = [p for p in itertools.combinations(cards, 2) if allowed_pair(*p)]
+    return sum(
+        1 for seating in itertools.combinations(pairs, k)
+        if len({c for p in seating for c in p}) == 2 * k
+    )
+
+
+class TestSeatingCounts(unittest.TestCase):
+
+    def test_count_seatings(self):
+        self.assertEqual(count_seatings(45, 1), 990)
+        self.assertEqual(count_seatings(6, 3), 15)
+        self.assertEqual(count_seatings(3, 2), 0)
+
+    def test_classes_match_brute_force(self):
+        rng = random.Random(2)
+
+        for _ in range(30):
+            counts = [rng.randint(1, 3) for _ in range(4)]
+            allowed = [[] for _ in counts]
+            for i, j in itertools.combinations_with_replacement(range(4), 2):
+                if rng.random() < 0.6:
+                    allowed[i].append(j)
+                    if i != j:
+                        allowed[j].append(i)
+
+            cards = [(i, n) for i, c in enumerate(counts) for n in range(c)]
+
+            def allowed_pair(a, b):
+                return b[0] in allowed[a[0]]
+
+            for k in range(1, 4):
+                expected = brute_force_matchings(cards, allowed_pair, k)
+                self.assertEqual(matching_counter(counts, allowed)(k), expected)
+                self.assertEqual(count_allowed_seatings(counts, allowed, k), expected)
+
+
+class TestExactVsMany(unittest.TestCase):
+
+    def setUp(self):
+        self.game = Game(all_cards)
+
+    def test_one_opponent_matches_exact_vs_one(self):
+        hero = make_cards(["AH", "KH"])
+        board = make_cards(["QH", "7D", "2C", "9H"])
+
+        many = self.game.exact_equity_vs_many(hero, board, 1)
+        one = self.game.exact_equity_vs_one(hero, board)
+
+        for key in ("wins", "ties", "losses", "total"):
+            self.assertEqual(many[key], one[key])
+
+    def test_two_opponents_on_the_river(self):
+        hero = make_cards(["AH", "KH"])
+        board = make_cards(["QH", "7D", "2C", "9H", "3S"])
+
+        result = self.game.exact_equity_vs_many(hero, board, 2)
+
+        # rank every live pair, then walk every pair of disjoint pairs
+        state = HandState(board + hero)
+        hero_key = state.cmp_key()
+        deck = self.game.remaining_deck(hero + board)
+        keys = {}
+        for pair in itertools.combinations(deck, 2):
+            keys[pair] = HandState(board + list(pair)).cmp_key()
+
+        wins = ties = 0
+        for a, b in itertools.combinations(keys, 2):
+            if set(a) & set(b):
+                continue
+            best = max(keys[a], keys[b])
+            if hero_key > best:
+                wins += 1
+            elif hero_key == best:
+                ties += 1
+
+        self.assertEqual(result["total"], count_seatings(45, 2))
+        self.assertEqual(result["wins"], wins)
+        self.assertEqual(result["ties"], ties)
+        self.assertAlmostEqual(result["win"] + result["tie"] + result["loss"], 1.0)
+
+    def test_more_opponents_lower_equity(self):
+        hero = make_cards(["7S", "7C"])
+        board = make_cards(["QH", "7D", "2C", "9H", "3S"])
+
+        wins = [
+            self.game.exact_equity_vs_many(hero, board, n)["win"]
+            for n in (1, 3, 6)
+        ]
+        self.assertTrue(wins[0] > wins[1] > wins[2] > 0)
+
+    def test_needs_a_flop(self):
+        with self.assertRaises(ValueError):
+            self.game.exact_equity_vs_many(make_cards(["AH", "AC"]), [], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+import random
+import unittest
+from hand import Card, Hand, HandState, RANK_VALUE
+
+
+def make_cards(card_strs):
+    return [Card(rank=s[0], suit=s[1:]) for s in card_strs]
+
+
+ALL_CARDS = [Card(r, s) for r in RANK_VALUE for s in ["H", "C", "S", "D"]]
+
+
+class TestHandState(unittest.TestCase):
+
+    def assertMatchesGetHand(self, cards):
+        expected = Hand(list(cards)).get_hand_from_scratch()
+        result = HandState(cards).get_hand()
+
+        self.assertEqual(result.type, expected.type, cards)
+        self.assertEqual(result.ranks, expected.ranks, cards)
+
+    # ---------- CATEGORIES ----------
+
+    def test_each_category(self):
+        hands = [
+            ["AH", "KD", "7S", "4C", "2D"],                 # High Card
+            ["AH", "AD", "KC", "7S", "4D", "2C"],           # Pair
+            ["AH", "AD", "KC", "KD", "7S", "7C", "2C"],     # Two Pair (3 pairs)
+            ["9H", "9D", "9S", "KC", "7D", "2C"],           # Trips
+            ["9H", "TD", "JS", "QC", "KD", "AC", "2C"],     # Straight
+            ["AH", "2D", "3S", "4C", "5D", "9H"],           # Wheel
+            ["AH", "KH", "9H", "6H", "3H", "2H", "QD"],     # Flush
+            ["AH", "AD", "AS", "KC", "KD", "KS", "2C"],     # Full House (two trips)
+            ["9H", "9D", "9S", "9C", "AH", "AD", "2D"],     # Quads
+            ["AH", "2H", "3H", "4H", "5H", "6D"],           # Steel wheel
+            ["9H", "TH", "JH", "QH", "KH", "AH"],           # Straight Flush
+        ]
+
+        for hand in hands:
+            self.assertMatchesGetHand(make_cards(hand))
+
+    def test_category_tracks_each_street(self):
+        hand = Hand()
+        streets = [
+            (["9H", "9D"], "Pair"),
+            (["TH", "JH", "QH"], "Pair"),
+            (["KH"], "Straight Flush"),
+            (["9S"], "Straight Flush"),
+        ]
+
+        for cards, category in streets:
+            for c in make_cards(cards):
+                hand.add_card(c)
+            self.assertEqual(hand.state.category, category)
+            self.assertEqual(hand.get_hand(), Hand(list(hand.cards)).get_hand_from_scratch())
+
+    def test_get_hand_reuses_state_across_streets(self):
+        hand = Hand(make_cards(["AH", "AD"]))
+        self.assertEqual(hand.get_hand().type, "Pair")
+        state = hand.state
+
+        for c in make_cards(["AS", "KC", "KD"]):
+            hand.add_card(c)
+
+        self.assertIs(hand.state, state)
+        self.assertEqual(hand.get_hand().type, "Full House")
+
+    def test_remove_from_empty_hand(self):
+        hand = Hand()
+        hand.remove_card(Card("A", "H"))
+        self.assertIsNone(hand.get_hand())
+
+    # ---------- BACKTRACKING ----------
+
+    def test_remove_restores_previous_state(self):
+        cards = make_cards(["AH", "AD", "KC", "7S", "4D"])
+        state = HandState(cards)
+        before = state.get_hand()
+
+        extra = make_cards(["AS", "AC"])
+        for c in extra:
+            state.add_card(c)
+        self.assertEqual(state.category, "Quads")
+
+        for c in extra:
+            state.remove_card(c)
+        self.assertEqual(state.category, "Pair")
+        self.assertEqual(state.get_hand(), before)
+
+    def test_random_hands_match_get_hand(self):
+        rng = random.Random(7)
+        state = HandState()
+
+        for _ in range(2000):
+            cards = rng.sample(ALL_CARDS, 7)
+            for c in cards:
+                state.add_card(c)
+            self.assertMatchesGetHand(cards)
+
+            expected = Hand(list(cards)).get_hand_from_scratch()
+            self.assertEqual(state.get_hand(), expected)
+            self.assertEqual(state.cmp_key(), expected._cmp_key())
+
+            for c in cards:
+                state.remove_card(c)
+            self.assertIsNone(state.category)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,122 @@
+import json
+import os
+import tempfile
+import unittest
+from equity import all_cards
+from hand import Card
+from preflop import (
+    HAND_CLASSES, PreflopChart, class_cards, generate_chart, hand_class,
+    load_checkpoint, write_json,
+)
+from simulation import MonteCarloSimulator
+
+
+class TestHandClasses(unittest.TestCase):
+
+    def test_169_classes(self):
+        self.assertEqual(len(HAND_CLASSES), 169)
+        self.assertEqual(len(set(HAND_CLASSES)), 169)
+        self.assertEqual(HAND_CLASSES[:3], ["AA", "AKs", "AKo"])
+
+    def test_class_of_cards(self):
+        self.assertEqual(hand_class([Card("A", "H"), Card("A", "C")]), "AA")
+        self.assertEqual(hand_class([Card("K", "S"), Card("A", "S")]), "AKs")
+        self.assertEqual(hand_class([Card("7", "D"), Card("T", "C")]), "T7o")
+
+    def test_representative_cards_round_trip(self):
+        for name in HAND_CLASSES:
+            self.assertEqual(hand_class(class_cards(name)), name)
+
+
+class TestPreflopChart(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "chart.json")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_generate_and_lookup(self):
+        chart, _ = generate_chart(
+            self.path, precision=0.05, classes=["AA", "72o"],
+            opponents=[1, 2], workers=2
+        )
+        self.assertFalse(os.path.exists(self.path + ".partial"))
+
+        loaded = PreflopChart.load(self.path)
+        aa = loaded.lookup([Card("A", "S"), Card("A", "D")], 1)
+        seven_deuce = loaded.lookup([Card("2", "S"), Card("7", "D")], 1)
+
+        self.assertGreater(aa["win"], 0.7)
+        self.assertLess(seven_deuce["win"], 0.45)
+        self.assertAlmostEqual(aa["win"] + aa["tie"] + aa["loss"], 1.0)
+        self.assertEqual(aa["win"], round(chart.win["AA"][0], 4))
+
+        # not computed
+        self.assertIsNone(loaded.lookup([Card("A", "S"), Card("A", "D")], 3))
+        self.assertIsNone(loaded.lookup([Card("K", "S"), Card("K", "D")], 1))
+
+    def test_resume_from_checkpoint(self):
+        write_json(self.path + ".partial", {
+            "precision": 0.05,
+            "entries": {"AA/1": [80, 1, 100]},
+        })
+
+        chart, _ = generate_chart(
+            self.path, precision=0.05, classes=["AA"], opponents=[1, 2], workers=1
+        )
+
+        # the finished entry was kept as-is, only AA/2 was sampled
+        self.assertEqual(chart.win["AA"][0], 0.8)
+        self.assertIsNotNone(chart.win["AA"][1])
+
+    def test_later_runs_extend_the_chart(self):
+        generate_chart(self.path, precision=0.05, classes=["AA"], opponents=[1], workers=1)
+        first = PreflopChart.load(self.path)
+
+        chart, _ = generate_chart(
+            self.path, precision=0.05, classes=["AA", "KK"], opponents=[1, 2], workers=1
+        )
+
+        # AA/1 came from the first chart, the other three were added
+        self.assertEqual(chart.entries["AA/1"], first.entries["AA/1"])
+        self.assertEqual(sorted(chart.entries), ["AA/1", "AA/2", "KK/1", "KK/2"])
+        self.assertEqual(sorted(PreflopChart.load(self.path).entries), sorted(chart.entries))
+
+        # nothing left to compute
+        again, _ = generate_chart(self.path, precision=0.05, classes=["AA"], opponents=[1])
+        self.assertEqual(again.entries["AA/1"], first.entries["AA/1"])
+
+        with self.assertRaises(ValueError):
+            generate_chart(self.path, precision=0.01, classes=["AA"], opponents=[1])
+
+    def test_checkpoint_precision_mismatch(self):
+        write_json(self.path + ".partial", {"precision": 0.01, "entries": {}})
+
+        with self.assertRaises(ValueError):
+            load_checkpoint(self.path + ".partial", 0.05)
+
+    def test_version_mismatch(self):
+        with open(self.path, "w") as f:
+            json.dump({"version": 0}, f)
+
+        with self.assertRaises(ValueError):
+            PreflopChart.load(self.path)
+
+    def test_simulator_uses_chart_only_preflop(self):
+        chart = PreflopChart.from_entries({"AA/2": [70, 0, 100]}, 0.05)
+        sim = MonteCarloSimulator(all_cards, preflop_chart=chart)
+        hero = [Card("A", "H"), Card("A", "C")]
+
+        result = sim.estimate_equity(hero, num_opponents=2)
+        self.assertEqual(result["win"], 0.7)
+        self.assertAlmostEqual(result["loss"], 0.3)
+
+        board = [Card("A", "S"), Card("K", "D"), Card("9", "C")]
+        flop = sim.estimate_equity(hero, board, num_opponents=2, trials=200)
+        self.assertGreater(flop["win"], 0.8)
+
+
+if __name__ == "__main__":
+    unittest.main()
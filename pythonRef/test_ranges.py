@@ -0,0 +1,122 @@
+import random
+import unittest
+from equity import Game, all_cards
+from hand import Card
+from ranges import (
+    COMBO_CARDS, COMBO_MASKS, card_id, cards_mask, combo_id, compile_range,
+    normalize, sample_opponents,
+)
+from simulation import MonteCarloSimulator
+
+
+def make_cards(card_strs):
+    return [Card(rank=s[0], suit=s[1:]) for s in card_strs]
+
+
+class TestRangeParsing(unittest.TestCase):
+
+    def test_combo_ids(self):
+        for i, (a, b) in enumerate(COMBO_CARDS):
+            self.assertEqual(combo_id(a, b), i)
+            self.assertEqual(combo_id(b, a), i)
+        self.assertEqual(len(COMBO_CARDS), 1326)
+
+    def test_combo_counts(self):
+        counts = {
+            "AA": 6, "AKs": 4, "AKo": 12, "AK": 16,
+            "TT+": 30, "TT-77": 24, "ATs+": 16, "KTo+": 36,
+            "98s-54s": 20, "A9s-A2s": 32, "AhKh": 1,
+            "TT+, AKs, KQo, 98s-54s": 66,
+        }
+        for text, expected in counts.items():
+            self.assertEqual(len(compile_range(text)), expected, text)
+
+    def test_normalize(self):
+        self.assertEqual(normalize(" tt+ ,aks:1, AhKd ,kqo:0.50"), "TT+,AKs,AhKd,KQo:0.5")
+
+    def test_weights_and_overrides(self):
+        r = compile_range("AK:0.5, AKs")
+
+        weights = dict(zip(r.combo_ids, r.weights))
+        suited = combo_id(card_id(Card("A", "H")), card_id(Card("K", "H")))
+        offsuit = combo_id(card_id(Card("A", "H")), card_id(Card("K", "C")))
+
+        self.assertEqual(weights[suited], 1.0)
+        self.assertEqual(weights[offsuit], 0.5)
+
+        self.assertEqual(len(compile_range("AA, AA:0")), 0)
+
+    def test_invalid_ranges(self):
+        for text in ["AX", "AKs-QJo", "AA:2", "AAs", "AhAh", "K9s-Q2s"]:
+            with self.assertRaises(ValueError, msg=text):
+                compile_range(text)
+
+    def test_cache_reuses_compiled_range(self):
+        self.assertIs(compile_range("tt+, aks"), compile_range("TT+,AKs"))
+
+    def test_live_drops_blocked_combos(self):
+        r = compile_range("AA, KK")
+        dead = cards_mask(make_cards(["AH", "KH", "KC"]))
+
+        live = r.live(dead)
+
+        self.assertEqual(len(live), 3 + 1)
+        self.assertTrue(all(not m & dead for m in live.masks))
+        self.assertIs(r.live(dead), live)
+
+
+class TestRangeEquity(unittest.TestCase):
+
+    def test_sample_opponents_never_share_cards(self):
+        rng = random.Random(5)
+        ranges = [compile_range("AA, KK"), compile_range("AA")]
+
+        for _ in range(200):
+            picks, used = sample_opponents(ranges, rng)
+            cards = [c for pick in picks for c in pick]
+            self.assertEqual(len(set(cards)), 4)
+            masks = [COMBO_MASKS[combo_id(*pick)] for pick in picks]
+            self.assertEqual(used, masks[0] | masks[1])
+
+    def test_exact_equity_vs_range(self):
+        game = Game(all_cards)
+        hero = make_cards(["AH", "KH"])
+        board = make_cards(["QH", "7D", "2C", "9H", "3S"])
+
+        result = game.exact_equity_vs_one(hero, board, opp_range="QQ, 77")
+
+        # 3 live QQ and 3 live 77 combos, all of them make a set
+        self.assertEqual(result["total"], 6)
+        self.assertEqual(result["wins"], 0)
+
+        weighted = game.exact_equity_vs_one(hero, board, opp_range="QQ:0.5, AKo")
+        self.assertEqual(weighted["total"], 1.5 + 6)
+        self.assertEqual(weighted["wins"], 0)
+        self.assertEqual(weighted["ties"], 6)
+
+    def test_exact_equity_vs_dead_range(self):
+        game = Game(all_cards)
+
+        with self.assertRaises(ValueError):
+            game.exact_equity_vs_one(make_cards(["AH", "AC"]), make_cards(["AS", "AD", "2C"]),
+                                     opp_range="AA")
+
+    def test_simulator_with_ranges(self):
+        random.seed(9)
+        sim = MonteCarloSimulator(all_cards)
+        hero = make_cards(["KH", "KC"])
+        board = make_cards(["2S", "7D", "9C"])
+
+        vs_aces = sim.estimate_equity(hero, board, trials=400, opponent_ranges="AA")
+        vs_junk = sim.estimate_equity(hero, board, 2, trials=400,
+                                      opponent_ranges=["32o", "54s"])
+
+        self.assertLess(vs_aces["win"], 0.2)
+        self.assertGreater(vs_junk["win"], 0.6)
+
+        with self.assertRaises(ValueError):
+            sim.estimate_equity(hero, board, 2, trials=10, opponent_ranges=["AA"])
+
+
+if __name__ == "__main__":
+    unittest.main()
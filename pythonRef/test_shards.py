@@ -0,0 +1,116 @@
+import itertools
+import os
+import tempfile
+import unittest
+from equity import Game, all_cards
+from hand import Hand
+from shards import (
+    create_job, merge_shards, parse_cards, pending_shards, run_local, run_shard,
+    shard_path,
+)
+
+
+HERO = ["AH", "KH"]
+BOARD = ["QH", "7D", "2C", "9H"]
+
+
+class TestShardedEquity(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.job_dir = os.path.join(self.tmp.name, "job")
+        self.game = Game(all_cards)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_exact_counts_match_full_evaluation(self):
+        # a turn board, so every combo is completed through the
+        # add_card / remove_card backtracking
+        hero = parse_cards(HERO)
+        board = parse_cards(BOARD)
+
+        result = self.game.exact_equity_vs_one(hero, board)
+
+        wins = losses = ties = 0
+        deck = self.game.remaining_deck(hero + board)
+        for opp in itertools.combinations(deck, 2):
+            for river in deck:
+                if river in opp:
+                    continue
+                full_board = board + [river]
+                hero_hand = Hand(hero + full_board).get_hand_from_scratch()
+                opp_hand = Hand(list(opp) + full_board).get_hand_from_scratch()
+                if hero_hand > opp_hand:
+                    wins += 1
+                elif hero_hand < opp_hand:
+                    losses += 1
+                else:
+                    ties += 1
+
+        self.assertEqual((result["wins"], result["losses"], result["ties"]),
+                         (wins, losses, ties))
+        self.assertEqual(result["total"], 1035 * 44)
+
+    def test_shards_cover_every_combo_once(self):
+        hero = parse_cards(HERO)
+        board = parse_cards(BOARD)
+
+        combos = self.game.opponent_combos(hero, board)
+        sharded = [
+            c for s in range(7)
+            for c in self.game.shard_combos(hero, board, s, 7)
+        ]
+
+        self.assertEqual(len(sharded), len(combos))
+        self.assertEqual(set(sharded), set(combos))
+
+    def test_merge_matches_single_run(self):
+        expected = self.game.exact_equity_vs_one(parse_cards(HERO), parse_cards(BOARD))
+
+        result = run_local(self.job_dir, HERO, BOARD, num_shards=4, workers=2)
+
+        for key in ("wins", "losses", "ties", "total"):
+            self.assertEqual(result[key], expected[key])
+
+    def test_resume_only_runs_missing_shards(self):
+        create_job(self.job_dir, HERO, BOARD, 3)
+        run_shard(self.job_dir, 1)
+        self.assertEqual(pending_shards(self.job_dir, 3), [0, 2])
+
+        with self.assertRaises(ValueError):
+            merge_shards(self.job_dir)
+
+        done_before = os.path.getmtime(shard_path(self.job_dir, 1))
+        result = run_local(self.job_dir, HERO, BOARD, num_shards=3, workers=1)
+
+        self.assertEqual(os.path.getmtime(shard_path(self.job_dir, 1)), done_before)
+        self.assertEqual(pending_shards(self.job_dir, 3), [])
+        self.assertEqual(result["total"], 1035 * 44)
+
+    def test_cards_are_normalized_and_checked(self):
+        job = create_job(self.job_dir, ["Ah", "kh"], ["qH", "7d", "2c", "9h"], 3)
+        self.assertEqual(job["hero"], HERO)
+        self.assertEqual(job["board"], BOARD)
+
+        bad = [
+            (["AH", "KX"], BOARD),              # no such suit
+            (["AH", "1H"], BOARD),              # no such rank
+            (["AH", "AH"], BOARD),              # hero pair repeats
+            (["AH", "qh"], BOARD),              # hero card on the board
+            (["AH", "KH"], BOARD[:2]),          # not a street
+        ]
+        for hero, board in bad:
+            with self.assertRaises(ValueError, msg=(hero, board)):
+                create_job(os.path.join(self.tmp.name, "bad"), hero, board, 3)
+        self.assertFalse(os.path.exists(os.path.join(self.tmp.name, "bad")))
+
+    def test_reopening_with_other_job_fails(self):
+        create_job(self.job_dir, HERO, BOARD, 3)
+
+        with self.assertRaises(ValueError):
+            create_job(self.job_dir, HERO, BOARD, 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,128 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from hand import Card
+from preflop import PreflopChart
+from shared_tables import (
+    TableRegistry, attach, cleanup_stale, detach, get_table, init_worker,
+)
+
+
+def table_sum(name):
+    return sum(get_table(name))
+
+
+def table_value(name, i):
+    return get_table(name)[i]
+
+
+def chart_lookup(spec):
+    chart = PreflopChart.attach(spec)
+    return chart.lookup([Card("A", "S"), Card("A", "D")], 2)
+
+
+class TestSharedTables(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.registry = TableRegistry(manifest_dir=self.tmp.name)
+
+    def tearDown(self):
+        self.registry.close()
+        self.tmp.cleanup()
+
+    def test_attach_is_read_only(self):
+        spec = self.registry.publish("ranks", array("q", range(10)))
+
+        table = attach(spec, use_numpy=False)
+        self.assertEqual(list(table), list(range(10)))
+        with self.assertRaises(TypeError):
+            table[0] = 5
+
+        detach("ranks")
+
+    def test_shape(self):
+        spec = self.registry.publish("grid", array("d", range(6)), shape=(2, 3))
+
+        table = attach(spec, use_numpy=False)
+        self.assertEqual(table[1, 2], 5.0)
+        self.assertEqual(table.tolist(), [[0.0, 1.0, 2.0], [3.0, 4.0, 5.0]])
+
+        detach("grid")
+
+    def test_publish_file(self):
+        path = os.path.join(self.tmp.name, "table.bin")
+        with open(path, "wb") as f:
+            array("H", [7, 8, 9]).tofile(f)
+
+        spec = self.registry.publish_file("disk", path, "H")
+
+        self.assertEqual(list(attach(spec, use_numpy=False)), [7, 8, 9])
+        detach("disk")
+
+    def test_workers_share_one_copy(self):
+        spec = self.registry.publish("values", array("q", [1, 2, 3]))
+
+        with ProcessPoolExecutor(max_workers=2, initializer=init_worker,
+                                 initargs=([spec], False)) as pool:
+            self.assertEqual(pool.submit(table_sum, "values").result(), 6)
+
+            # workers see writes to the one shared segment
+            self.registry._segments[0].buf[:8] = array("q", [100]).tobytes()
+            results = [pool.submit(table_value, "values", 0).result() for _ in range(4)]
+
+        self.assertEqual(results, [100] * 4)
+
+    def test_preflop_chart_through_registry(self):
+        chart = PreflopChart.from_entries({"AA/2": [70, 1, 100]}, 0.05)
+        spec = chart.publish(self.registry)
+
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            result = pool.submit(chart_lookup, spec).result()
+
+        self.assertEqual(result["win"], 0.7)
+        self.assertEqual(result["tie"], 0.01)
+
+        attached = PreflopChart.attach(spec)
+        self.assertIsNone(attached.lookup([Card("A", "S"), Card("A", "D")], 3))
+
+        # the chart's rows are views into the segment, drop them first
+        del attached
+        detach("preflop_chart")
+
+    def test_close_unlinks_segments(self):
+        spec = self.registry.publish("gone", array("q", [1]))
+        self.registry.close()
+
+        with self.assertRaises(FileNotFoundError):
+            shared_memory.SharedMemory(name=spec["segment"])
+        self.assertEqual(os.listdir(self.tmp.name), [])
+
+    def test_cleanup_after_crashed_owner(self):
+        # a pid that is certainly gone
+        child = subprocess.run([sys.executable, "-c", "import os; print(os.getpid())"],
+                               capture_output=True, text=True)
+        dead_pid = int(child.stdout)
+
+        shm = shared_memory.SharedMemory(create=True, size=16)
+        with open(os.path.join(self.tmp.name, "crashed.json"), "w") as f:
+            json.dump({"pid": dead_pid, "segments": [shm.name]}, f)
+        shm.close()
+
+        self.assertEqual(cleanup_stale(self.tmp.name), 1)
+        with self.assertRaises(FileNotFoundError):
+            shared_memory.SharedMemory(name=shm.name)
+
+        # this registry's own manifest is left alone
+        self.registry.publish("alive", array("q", [1]))
+        self.assertEqual(cleanup_stale(self.tmp.name), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import random
+import unittest
+from equity import all_cards
+from hand import Card, Hand, HandState
+from simulation import MonteCarloSimulator
+
+
+def make_cards(card_strs):
+    return [Card(rank=s[0], suit=s[1:]) for s in card_strs]
+
+
+# the showdown as it was done before: a full Hand for every player
+def full_showdown(board, hero_cards, opponents):
+    hero_hand = Hand(hero_cards + board).get_hand_from_scratch()
+    opp_hands = [Hand(opp + board).get_hand_from_scratch() for opp in opponents]
+
+    if any(opp_hand > hero_hand for opp_hand in opp_hands):
+        return "loss"
+    if any(opp_hand == hero_hand for opp_hand in opp_hands):
+        return "tie"
+    return "win"
+
+
+class TestShowdown(unittest.TestCase):
+
+    def setUp(self):
+        self.sim = MonteCarloSimulator(all_cards)
+
+    def test_board_plays_for_everyone(self):
+        board = make_cards(["9H", "TH", "JH", "QH", "KH"])
+        hero = make_cards(["2C", "3C"])
+        opponents = [make_cards(["4D", "5D"]), make_cards(["6S", "7S"])]
+
+        self.assertEqual(self.sim.showdown(HandState(board), hero, opponents), "tie")
+
+    def test_kicker_decides_same_category(self):
+        board = make_cards(["AH", "AD", "7S", "4C", "2D"])
+        hero = make_cards(["KC", "3C"])
+        opponents = [make_cards(["QD", "JD"]), make_cards(["KS", "8S"])]
+
+        self.assertEqual(self.sim.showdown(HandState(board), hero, opponents), "loss")
+
+    def test_matches_full_evaluation(self):
+        rng = random.Random(11)
+
+        for _ in range(1000):
+            num_opponents = rng.randint(1, 8)
+            cards = rng.sample(all_cards, 7 + 2 * num_opponents)
+            board, hero = cards[:5], cards[5:7]
+            opponents = [cards[i:i + 2] for i in range(7, len(cards), 2)]
+
+            board_state = HandState(board)
+            self.assertEqual(
+                self.sim.showdown(board_state, hero, opponents),
+                full_showdown(board, hero, opponents)
+            )
+            # the board state is left as it was found
+            self.assertEqual(board_state.cards, board)
+
+    def test_estimate_equity_sums_to_one(self):
+        random.seed(3)
+        hero = make_cards(["AH", "AC"])
+        board = make_cards(["AS", "KD", "9C"])
+
+        result = self.sim.estimate_equity(hero, board, num_opponents=3, trials=500)
+
+        self.assertAlmostEqual(result["win"] + result["tie"] + result["loss"], 1.0)
+        self.assertGreater(result["win"], 0.8)
+
+
+if __name__ == "__main__":
+    unittest.main()